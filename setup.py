@@ -17,4 +17,5 @@ setuptools.setup(name='text_cryptography',
                  long_description=long_description,
                  long_description_content_type="text/markdown",
                  packages=setuptools.find_packages(),
+                 extras_require={'numpy': ['numpy']},
                  include_package_data=True)
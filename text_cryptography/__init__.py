@@ -0,0 +1,3 @@
+from text_cryptography.cipher import (CHAIN, CHARS, Chain, Cipher,
+                                      InvalidCharacterError, decrypt,
+                                      decrypt_many, encrypt, encrypt_many)
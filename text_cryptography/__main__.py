@@ -1,31 +1,70 @@
-import string
+import os
+import sys
+import mmap
+import json
+import hashlib
 import logging
-from operator import add, sub
-from collections import defaultdict
+import argparse
+import itertools
+from contextlib import nullcontext
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from text_cryptography.cipher import (BACKENDS, CHAIN, CHARS, METHOD_NAMES,
+                                      Cipher, InvalidCharacterError,
+                                      cipher_cache, get_cipher, parse_chain,
+                                      parse_key, transform)
+from text_cryptography.log import Preview, enable_debug
 from text_cryptography.log import debug_logger as logger
+from text_cryptography.stats import Stats
 
 
 DEBUG = False
 if DEBUG:
-    logger.disabled = False
+    enable_debug()
 else:
     logging.disable(logging.CRITICAL)
 
+CHUNK_SIZE = 1024 * 1024
+POLICIES = ("strict", "skip", "pass")
+# The number of invalid character offsets kept for the report
+INVALID_OFFSETS = 10
+STATE_SUFFIX = ".state"
+INDEX_SUFFIX = ".index"
+# The number of lines between the offsets kept in a line index
+LINE_INTERVAL = 1000
+# The number of bytes at each end of the processed prefix that are checked
+CHECK_SIZE = 64 * 1024
+# The environment variable the key is read from when it is not given
+KEY_ENV = "TEXT_CRYPTOGRAPHY_KEY"
+# The exit status when encryption/decryption fails, usage errors exit with 2
+EXIT_FAILURE = 1
+
 
 class Cryptography:
 
-    CHARS = string.ascii_letters + string.digits + string.punctuation + \
-            " \n"
+    CHARS = CHARS
 
     def __init__(self, file=None, crypt_type=None, crypt_method=None,
-                 key=None):
+                 key=None, workers=1, backend="python", policy="skip"):
         self._file = file
         self._crypt_type = crypt_type
         self._crypt_method = crypt_method
         self._key = key
+        self._file_cache = None
+        if type(workers) is not int or workers < 1:
+            raise ValueError(f"workers was: {workers}")
+        self.workers = workers
+        self.backend = backend
+        if policy not in POLICIES:
+            raise ValueError(f"policy was: {policy}")
+        self.policy = policy
+        self.invalid = Counter()
+        self.invalid_offsets = []
+        self.stats = Stats()
         self.crypt_methods = {"C": lambda: self.caesar_cipher(),
                               "M": lambda: self.monoalphabetic(),
-                              "P": lambda: self.polyalphabetic()}
+                              "P": lambda: self.polyalphabetic(),
+                              CHAIN: lambda: self.chain()}
 
     def caesar_cipher(self):
         """
@@ -33,18 +72,8 @@ class Cryptography:
 
         :return string: The encrypted/decrypted file data.
         """
-        chars = list(self.CHARS * 2)
-        data = ""
-        crypt_operator = add if self.crypt_type == "encrypt" else sub
-
-        for character in self.file_data:
-            try:
-                index = crypt_operator(chars.index(character), self.key)
-                data += chars[index]
-            except (ValueError, TypeError) as e:
-                logger.error(e)
-                print(f"Invalid character '{character}' in file {self.file}.")
-        logger.info(f"data: {data}")
+        data = self.crypt('C')
+        logger.info("data: %s", Preview(data))
         return data
 
     def monoalphabetic(self):
@@ -53,70 +82,553 @@ class Cryptography:
 
         :return string: The encrypted/decrypted file data.
         """
-        key = list(dict.fromkeys(self.key))
-        cipher_text = list(self.CHARS)
+        data = self.crypt('M')
+        logger.info("data: %s", Preview(data))
+        return data
 
-        key = list(dict.fromkeys(key))
-        for index, key_char in enumerate(key, 0):
-            if key_char in self.CHARS:
-                cipher_text.remove(key_char)
-                cipher_text.insert(index, key_char)
+    def polyalphabetic(self):
+        """
+        Encrypts or decrypts the file using a polyalphabetic cipher.
 
-        cipher = dict(zip(self.CHARS, cipher_text))
-        logger.info(f"cipher: {cipher}")
-        keys = cipher.keys()
-        values = cipher.values()
+        :return string: The encrypted/decrypted file data.
+        """
+        data = self.crypt('P')
+        logger.info("data: %s", Preview(data))
+        return data
 
-        data = ""
-        for character in self.file_data:
-            try:
-                if self.crypt_type == "encrypt":
-                    data += list(keys)[list(values).index(character)]
-                else:
-                    data += list(values)[list(keys).index(character)]
-            except (ValueError, TypeError) as e:
-                logger.error(e)
-                print(f"Invalid character '{character}' in file {self.file}.")
-        logger.info(f"data: {data}")
+    def chain(self):
+        """
+        Encrypts or decrypts the file using a chain of ciphers, whose stages
+        are the key, in a single pass.
 
+        :return string: The encrypted/decrypted file data.
+        """
+        data = self.crypt(CHAIN)
+        logger.info("data: %s", Preview(data))
         return data
 
-    def polyalphabetic(self):
+    def crypt(self, crypt_method):
         """
-        Encrypts or decrypts the file using a polyalphabetic cipher.
+        Encrypts or decrypts the file data with the compiled cipher for the
+        method.
 
+        :param string crypt_method: The method of cryptography.
         :return string: The encrypted/decrypted file data.
         """
-        sequence = []
-        for key_char in self.key:
-            for i, char in enumerate(self.CHARS, 0):
-                if key_char == char:
-                    sequence.append(i)
+        file_data = self.file_data
+        size = -(-len(file_data) // self.workers) or 1
+        segments = ((offset, file_data[offset:offset + size])
+                    for offset in range(0, len(file_data), size))
+        return "".join(self.crypt_segments(crypt_method, segments))
 
-        map_data = []
-        for data_char in range(0, len(self.file_data), 3):
-            for char in sequence:
-                map_data.append(char)
+    def crypt_file(self, file, chunk_size=CHUNK_SIZE, binary=False):
+        """
+        Encrypts or decrypts the file a chunk at a time, writing each chunk
+        to the given file as soon as it is transformed.
 
-        pair_data = []
-        for x in zip(self.file_data, map_data):
-            pair_data.append(x)
+        :param string file: The file to write to.
+        :param integer chunk_size: The number of characters in each chunk.
+        :param bool binary: Read and write bytes, without decoding or
+               newline translation, so that the transform runs entirely
+               through bytes.translate.
+        :return None:
+        """
+        with open(self.file, 'rb' if binary else 'r') as in_file, \
+                open(file, 'wb' if binary else 'w') as out_file:
+            self.crypt_stream(in_file, out_file, chunk_size)
 
-        crypt_operator = add if self.crypt_type == "encrypt" else sub
+    def crypt_stream(self, in_file, out_file, chunk_size=CHUNK_SIZE,
+                     offset=0, limit=None):
+        """
+        Encrypts or decrypts an open file, such as stdin, a chunk at a time,
+        writing and flushing each chunk to the open output file as soon as it
+        is transformed, so that only a chunk is held in memory. Binary files
+        are read with read1 where they have it, so that a pipe is
+        transformed as data arrives instead of a full chunk at a time.
+
+        :param file in_file: The open file to read from.
+        :param file out_file: The open file to write to, in the same mode.
+        :param integer chunk_size: The number of characters in each chunk.
+        :param integer offset: The key position of the input, used to carry
+               the key position when resuming.
+        :param integer limit: The most characters or bytes to read, so that
+               data appended while reading is left for the next run.
+        :return None:
+        """
+        read = getattr(in_file, "read1", in_file.read)
+        empty = in_file.read(0)
+
+        def segments(offset):
+            remaining = limit
+            while remaining is None or remaining > 0:
+                size = (chunk_size if remaining is None
+                        else min(chunk_size, remaining))
+                with self.stats.stage("read") as call:
+                    chunk = read(size)
+                    call["size"] = len(chunk)
+                if chunk == empty:
+                    break
+                yield offset, chunk
+                offset += len(chunk)
+                if remaining is not None:
+                    remaining -= len(chunk)
+
+        for data in self.crypt_segments(self.crypt_method, segments(offset)):
+            with self.stats.stage("write") as call:
+                out_file.write(data)
+                out_file.flush()
+                call["size"] = len(data)
+
+    def crypt_incremental(self, file, state_file=None, chunk_size=CHUNK_SIZE):
+        """
+        Encrypts or decrypts only the bytes appended to the file since the
+        last run, appending them to the new file. A sidecar state file keeps
+        the processed offset, the key position and a checksum of the
+        processed prefix. If the file was truncated or rewritten, the key
+        changed or the new file no longer matches, the whole file is done
+        again.
 
-        data = []
-        chars = list(self.CHARS * 2)
-        for pair in pair_data:
-            try:
-                char, shift = pair
-                new_char_index = crypt_operator(self.CHARS.index(char), shift)
-                data.append(chars[new_char_index])
-            except (ValueError, TypeError) as e:
-                logger.error(e)
-                print(f"Invalid character '{character}' in file {self.file}.")
-        logger.info(f"data: {data}")
+        :param string file: The file to write to.
+        :param string state_file: The state file, defaults to the new file
+               with a '.state' suffix.
+        :param integer chunk_size: The number of bytes in each chunk.
+        :return integer: The offset the run started from, 0 for a full pass.
+        """
+        state_file = state_file or file + STATE_SUFFIX
+        cipher = self.cipher(self.crypt_method)
+        size = os.path.getsize(self.file)
+        expected = {"fingerprint": cipher.fingerprint,
+                    "crypt_type": self.crypt_type,
+                    "policy": self.policy}
+
+        with open(self.file, 'rb') as in_file:
+            start = 0
+            state = self.read_state(state_file)
+            if (state is not None and
+                    all(state.get(name) == value
+                        for name, value in expected.items()) and
+                    state["offset"] <= size and
+                    os.path.exists(file) and
+                    os.path.getsize(file) == state["output_size"] and
+                    self.checksum(in_file, state["offset"]) ==
+                    state["checksum"]):
+                start = state["offset"]
+            logger.info("incremental start: %s of %s", start, size)
+
+            # Skipped characters use up no key positions, so the key
+            # carries on from the end of the new file
+            position = state["output_size"] if start else 0
+            in_file.seek(start)
+            with open(file, 'ab' if start else 'wb') as out_file:
+                self.crypt_stream(in_file, out_file, chunk_size, position,
+                                  size - start)
+
+            output_size = os.path.getsize(file)
+            state = dict(expected, offset=size,
+                         key_position=output_size % cipher.period,
+                         checksum=self.checksum(in_file, size),
+                         output_size=output_size)
+        with open(state_file, 'w') as f:
+            json.dump(state, f)
+        return start
+
+    @staticmethod
+    def read_state(state_file):
+        """
+        Reads an incremental state file.
+
+        :param string state_file: The state file.
+        :return dict | None: The state, or None if there is no valid state.
+        """
+        try:
+            with open(state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def checksum(file, length):
+        """
+        Hashes the length and the first and last bytes of a prefix of an
+        open binary file, so that a truncated or rewritten prefix is found
+        without reading all of it.
+
+        :param file file: The open binary file.
+        :param integer length: The length of the prefix.
+        :return string: The checksum.
+        """
+        checksum = hashlib.sha256(str(length).encode())
+        file.seek(0)
+        checksum.update(file.read(min(length, CHECK_SIZE)))
+        file.seek(max(length - CHECK_SIZE, 0))
+        checksum.update(file.read(min(length, CHECK_SIZE)))
+        return checksum.hexdigest()
+
+    def crypt_range(self, start, length=None):
+        """
+        Encrypts or decrypts only a range of the file, seeking straight to
+        it. Caesar and monoalphabetic ciphers do not depend on the position
+        and the polyalphabetic shift only depends on the position modulo the
+        key length, so the range comes out exactly as it would from the whole
+        file, at a cost that depends only on its length.
+
+        :param integer start: The byte offset of the range.
+        :param integer length: The number of bytes, defaults to the rest of
+               the file.
+        :return bytes: The encrypted/decrypted range.
+        """
+        with open(self.file, 'rb') as f:
+            f.seek(start)
+            with self.stats.stage("read") as call:
+                data = f.read(-1 if length is None else length)
+                call["size"] = len(data)
+        return b"".join(self.crypt_segments(self.crypt_method,
+                                            [(start, data)]))
+
+    def crypt_lines(self, first, count, index_file=None):
+        """
+        Encrypts or decrypts a range of lines of the file, where the lines
+        are those of the encrypted/decrypted text.
+
+        :param integer first: The first line, counted from 0.
+        :param integer count: The number of lines.
+        :param string index_file: An optional line index from index_lines,
+               used to skip to the nearest indexed line instead of scanning
+               from the start of the file.
+        :return bytes: The encrypted/decrypted lines.
+        """
+        start, end = self.line_range(first, count, index_file)
+        return self.crypt_range(start, end - start)
+
+    def line_range(self, first, count, index_file=None,
+                   chunk_size=CHUNK_SIZE):
+        """
+        Finds the byte range of some lines of the encrypted/decrypted text,
+        starting from the nearest line in the index if there is one.
+
+        :param integer first: The first line, counted from 0.
+        :param integer count: The number of lines.
+        :param string index_file: An optional line index from index_lines,
+               which is ignored if it does not match the file and key.
+        :param integer chunk_size: The number of bytes in each chunk.
+        :return tuple: The start and end offsets of the lines.
+        """
+        line = offset = 0
+        index = self.read_index(index_file) if index_file else None
+        if index is not None:
+            position = min(first // index["interval"],
+                           len(index["offsets"]) - 1)
+            line = position * index["interval"]
+            offset = index["offsets"][position]
+        logger.info("line %s: scanning from line %s at offset %s", first,
+                    line, offset)
+
+        bounds = list(self.find_lines((first, first + count), line, offset,
+                                      chunk_size))
+        bounds += [os.path.getsize(self.file)] * (2 - len(bounds))
+        return tuple(bounds)
+
+    def find_lines(self, lines, line=0, offset=0, chunk_size=CHUNK_SIZE):
+        """
+        Transforms the file from an offset, yielding where each of the lines
+        of the encrypted/decrypted text starts. Chunks that hold none of the
+        lines are only counted, not searched.
+
+        :param iterable lines: Increasing line numbers, counted from 0.
+        :param integer line: The line that starts at the offset.
+        :param integer offset: The byte offset to start from.
+        :param integer chunk_size: The number of bytes in each chunk.
+        :return generator: The offset of each line, until the end of the
+                file.
+        """
+        cipher = self.cipher(self.crypt_method)
+        lines = iter(lines)
+        target = next(lines, None)
+        with open(self.file, 'rb') as f:
+            f.seek(offset)
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                found = []
+                with self.stats.stage("index") as call:
+                    data = cipher.transform(chunk, offset)
+                    position = 0
+                    while target is not None:
+                        newlines = data.count(b"\n", position)
+                        if newlines < target - line:
+                            line += newlines
+                            break
+                        for _ in range(target - line):
+                            position = data.index(b"\n", position) + 1
+                        line = target
+                        found.append(offset + position)
+                        target = next(lines, None)
+                    call["size"] = len(chunk)
+                yield from found
+                if target is None:
+                    return
+                offset += len(chunk)
+
+    def index_lines(self, index_file=None, interval=LINE_INTERVAL,
+                    chunk_size=CHUNK_SIZE):
+        """
+        Transforms the whole file once to save the offset of every
+        interval-th line of the encrypted/decrypted text, so that later line
+        ranges only transform from the nearest indexed line. The index keeps
+        a key fingerprint and a checksum of the file so that a stale index
+        is never used.
+
+        :param string index_file: The index file, defaults to the file with
+               an '.index' suffix.
+        :param integer interval: The number of lines between offsets.
+        :param integer chunk_size: The number of bytes in each chunk.
+        :return dict: The index.
+        """
+        index_file = index_file or self.file + INDEX_SUFFIX
+        offsets = [0]
+        offsets.extend(self.find_lines(itertools.count(interval, interval),
+                                       chunk_size=chunk_size))
+        size = os.path.getsize(self.file)
+        with open(self.file, 'rb') as f:
+            checksum = self.checksum(f, size)
+        index = {"fingerprint": self.cipher(self.crypt_method).fingerprint,
+                 "crypt_type": self.crypt_type,
+                 "size": size,
+                 "checksum": checksum,
+                 "interval": interval,
+                 "offsets": offsets}
+        with open(index_file, 'w') as f:
+            json.dump(index, f)
+        return index
+
+    def read_index(self, index_file):
+        """
+        Reads a line index, checking that it was made for this file, key and
+        cryptography type.
+
+        :param string index_file: The index file.
+        :return dict | None: The index, or None if it is missing or stale.
+        """
+        index = self.read_state(index_file)
+        if index is None:
+            return None
+        try:
+            size = os.path.getsize(self.file)
+            if (index["fingerprint"] !=
+                    self.cipher(self.crypt_method).fingerprint or
+                    index["crypt_type"] != self.crypt_type or
+                    index["size"] != size):
+                return None
+            with open(self.file, 'rb') as f:
+                if self.checksum(f, size) != index["checksum"]:
+                    return None
+        except KeyError:
+            return None
+        return index
+
+    def crypt_mmap(self, file, chunk_size=CHUNK_SIZE):
+        """
+        Encrypts or decrypts the file as bytes through memory maps, writing
+        into a preallocated output file of the same size. Only a chunk is
+        held in memory at a time, the rest is left to the OS page cache.
+
+        The file is read in binary and the output must be the same size, so
+        unless the policy is 'pass' every byte, including carriage returns,
+        must be in CHARS.
+
+        :param string file: The file to write to.
+        :param integer chunk_size: The number of bytes in each chunk.
+        :return None:
+        """
+        cipher = self.cipher(self.crypt_method)
+        size = os.path.getsize(self.file)
+        if not size:
+            self.write(file, "")
+            return
+
+        with open(self.file, 'rb') as in_file, \
+                mmap.mmap(in_file.fileno(), 0,
+                          access=mmap.ACCESS_READ) as in_map:
+            if self.policy != "pass":
+                for offset in range(0, size, chunk_size):
+                    with self.stats.stage("scan") as call:
+                        chunk = in_map[offset:offset + chunk_size]
+                        call["size"] = len(chunk)
+                        if Cipher.invalid_characters(chunk):
+                            raise InvalidCharacterError(
+                                Cipher.find_invalid(chunk, offset),
+                                self.file)
+
+            with open(file, 'w+b') as out_file:
+                out_file.truncate(size)
+                with mmap.mmap(out_file.fileno(), size) as out_map:
+                    for offset in range(0, size, chunk_size):
+                        with self.stats.stage("read") as call:
+                            chunk = in_map[offset:offset + chunk_size]
+                            call["size"] = len(chunk)
+                        with self.stats.stage("transform") as call:
+                            data = cipher.transform(chunk, offset)
+                            call["size"] = len(chunk)
+                        with self.stats.stage("write") as call:
+                            out_map[offset:offset + len(data)] = data
+                            call["size"] = len(data)
+
+    def crypt_segments(self, crypt_method, segments):
+        """
+        Encrypts or decrypts each segment in order. When there is more than
+        one worker the segments are spread over a process pool, with at most
+        two segments per worker in flight at once. The invalid characters
+        found are reported once every segment is done.
+
+        :param string crypt_method: The method of cryptography.
+        :param iterable segments: The (offset, data) pairs to transform, where
+               the offset of the first segment is also its key position.
+        :return generator: The encrypted/decrypted segments.
+        """
+        self.invalid = Counter()
+        self.invalid_offsets = []
+
+        if self.workers <= 1:
+            for position, segment in self.clean_segments(segments):
+                yield self.crypt_data(crypt_method, segment, position)
+        else:
+            with ProcessPoolExecutor(self.workers) as executor:
+                pending = deque()
+                for position, segment in self.clean_segments(segments):
+                    future = executor.submit(transform, crypt_method,
+                                             self.key, self.crypt_type,
+                                             segment, position, self.backend)
+                    pending.append((future, len(segment)))
+                    if len(pending) >= self.workers * 2:
+                        yield self.wait_segment(*pending.popleft())
+                while pending:
+                    yield self.wait_segment(*pending.popleft())
+
+        self.report_invalid()
+
+    def clean_segments(self, segments):
+        """
+        Applies the invalid character policy to each segment before it is
+        transformed. With 'skip' the invalid characters are left out first,
+        so they use up no key positions and the output decrypts with the
+        same key, and each segment starts at the key position after the
+        characters kept before it.
+
+        :param iterable segments: The (offset, data) pairs to transform.
+        :return generator: The (key position, data) pairs to transform.
+        """
+        position = None
+        for offset, segment in segments:
+            if position is None or self.policy != "skip":
+                position = offset
+            invalid = self.check_invalid(segment, offset)
+            segment = self.remove_invalid(segment, invalid)
+            yield position, segment
+            position += len(segment)
+
+    def wait_segment(self, future, size):
+        """
+        Waits for a segment transformed by a worker process, recording the
+        wait as the transform stage.
+
+        :param Future future: The transform of the segment.
+        :param integer size: The length of the segment.
+        :return string | bytes: The encrypted/decrypted segment.
+        """
+        with self.stats.stage("transform") as call:
+            data = future.result()
+            call["size"] = size
+        return data
+
+    def crypt_data(self, crypt_method, file_data, offset=0):
+        """
+        Encrypts or decrypts the data with the compiled cipher for the method,
+        once the invalid character policy has been applied to it.
+
+        :param string crypt_method: The method of cryptography.
+        :param string file_data: The data to encrypt/decrypt.
+        :param integer offset: The key position of the data.
+        :return string: The encrypted/decrypted data.
+        """
+        cipher = self.cipher(crypt_method)
+        with self.stats.stage("transform") as call:
+            data = cipher.transform(file_data, offset)
+            call["size"] = len(file_data)
+        return data
+
+    def check_invalid(self, file_data, offset=0):
+        """
+        Scans the data for invalid characters and records them for the
+        report, raising an InvalidCharacterError if the policy is 'strict'.
+
+        :param string | bytes file_data: The data to check.
+        :param integer offset: The position of the data in the file.
+        :return set: The invalid characters in the data.
+        """
+        with self.stats.stage("scan") as call:
+            invalid = Cipher.invalid_characters(file_data)
+            call["size"] = len(file_data)
+        if not invalid:
+            return invalid
+
+        found = Cipher.find_invalid(file_data, offset)
+        if self.policy == "strict":
+            raise InvalidCharacterError(found, self.file)
+
+        self.invalid.update(character for _, character in found)
+        self.invalid_offsets.extend(
+            offset for offset, _ in found[:INVALID_OFFSETS -
+                                           len(self.invalid_offsets)])
+        return invalid
+
+    def remove_invalid(self, data, invalid):
+        """
+        Leaves the invalid characters out of the data to encrypt/decrypt if
+        the policy is 'skip'.
+
+        :param string | bytes data: The data to encrypt/decrypt.
+        :param set invalid: The invalid characters, or byte values for bytes.
+        :return string | bytes: The data.
+        """
+        if not invalid or self.policy != "skip":
+            return data
+        if isinstance(data, bytes):
+            return data.translate(None, bytes(invalid))
+        return data.translate(dict.fromkeys(map(ord, invalid)))
+
+    def report_invalid(self):
+        """
+        Prints one summary of the invalid characters found in the last run
+        to stderr.
+
+        :return None:
+        """
+        if not self.invalid:
+            return
+        action = "skipped" if self.policy == "skip" else "passed through"
+        characters = ", ".join(f"{character!r} x{count}" for character, count
+                               in self.invalid.most_common())
+        offsets = ", ".join(map(str, self.invalid_offsets))
+        message = f"{sum(self.invalid.values())} invalid characters " \
+            f"{action} in file {self.file}: {characters} (first at " \
+            f"{offsets})."
+        logger.error(message)
+        # Never mixed into the data, which may be going to stdout
+        print(message, file=sys.stderr)
+
+    def cipher(self, crypt_method):
+        """
+        Gets the compiled cipher for the method, current key and cryptography
+        type from the cache shared by every Cryptography object.
 
-        return "".join(data)
+        :param string crypt_method: The method of cryptography.
+        :return Cipher: The compiled cipher.
+        """
+        with self.stats.stage("compile") as call:
+            misses = cipher_cache.misses
+            cipher = get_cipher(crypt_method, self.key, self.crypt_type,
+                                self.backend)
+            call["hit"] = cipher_cache.misses == misses
+        logger.info("cipher: %s", Preview(cipher.tables))
+        return cipher
 
     @property
     def file(self):
@@ -144,11 +656,21 @@ class Cryptography:
     @property
     def file_data(self):
         """
-        Gets the contents of the data file.
+        Gets the contents of the data file. The contents are cached and only
+        read again when the file, its modification time or its size changes.
 
         :return string: The file contents.
         """
-        return self.read(self.file)
+        with self.stats.stage("read") as call:
+            stat = os.stat(self.file)
+            signature = (self.file, stat.st_mtime_ns, stat.st_size)
+            call["hit"] = (self._file_cache is not None and
+                           self._file_cache[0] == signature)
+            if not call["hit"]:
+                logger.info("reading file: %s", self.file)
+                self._file_cache = (signature, self.read(self.file))
+                call["size"] = len(self._file_cache[1])
+        return self._file_cache[1]
 
     @property
     def crypt_type(self):
@@ -259,6 +781,21 @@ Polyalphabetic Cipher: 'P'"""
         with open(file, 'r') as file:
             return file.read()
 
+    @staticmethod
+    def read_chunks(file, chunk_size=CHUNK_SIZE, binary=False):
+        """
+        Read the file and yield its contents a chunk at a time.
+
+        :param string file: The file to read.
+        :param integer chunk_size: The number of characters in each chunk.
+        :param bool binary: Read bytes instead of text.
+        :return generator: The file contents in chunks.
+        """
+        with open(file, 'rb' if binary else 'r') as file:
+            for chunk in iter(lambda: file.read(chunk_size),
+                              b"" if binary else ""):
+                yield chunk
+
     @staticmethod
     def write(file, text):
         """
@@ -277,15 +814,14 @@ class Check:
     @staticmethod
     def file_exists(file):
         """
-        Check if the file exists by reading it.
+        Check if the file exists without reading it.
 
         :param string file: The file to check.
         :return True | False: Does the file exist?
         """
         try:
-            Cryptography.read(file)
-            return True
-        except (FileNotFoundError, FileExistsError):
+            return os.path.isfile(file)
+        except (TypeError, ValueError):
             return False
 
     @staticmethod
@@ -345,50 +881,249 @@ class Check:
                 except (TypeError, ValueError):
                     print("You must enter an integer between 1 and 95!")
                     key = input("Enter an encryption key\n>> ")
-        elif crypt_method in ('M', 'P'):
+        elif crypt_method == 'P':
+            while not any(key_char in CHARS for key_char in key):
+                print("You must enter at least one letter, digit or "
+                      "symbol!")
+                key = input("Enter an encryption key\n>> ")
+        elif crypt_method in ('M', CHAIN):
             pass
         else:
             return False
         return True, key
 
 
-def main():
-    """ Beginning of the program. """
-    # file = None
-    # for arg in sys.argv:
-    #     if ".txt" in arg or ".py" not in arg or ".log" not in arg:
-    #         file = arg
-
-    file = input("Enter a file: ")
-
-    file_data = Cryptography()
-    file_data.file = file
-
-    crypt_type = input("Please enter 'E' to encrypt or 'D' to decrypt\n>> ")
-    file_data.crypt_type = crypt_type
-
-    crypt_type = "encrypt" if crypt_type == 'E' else "decrypt"
-
-    file_data.crypt_method = file_data.crypt_method
-
-    key = input("Please enter a key for your data\n>> ")
-    file_data.key = key
+def positive_integer(value):
+    """
+    Parses a command line value that must be a positive integer.
+
+    :param string value: The value entered on the command line.
+    :return integer: The value.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, not "
+                                         f"'{value}'")
+    return number
+
+
+def open_stream(file, mode):
+    """
+    Opens the file, or stdin/stdout for '-' without closing them afterwards.
+
+    :param string file: The file, or '-'.
+    :param string mode: The mode to open the file in.
+    :return file: The open file, as a context manager.
+    """
+    if file != '-':
+        return open(file, mode)
+    stream = sys.stdin if 'r' in mode else sys.stdout
+    return nullcontext(stream.buffer if 'b' in mode else stream)
+
+
+def read_key(args, parser):
+    """
+    Gets the key from the command line, a key file or the environment, in
+    that order.
+
+    :param Namespace args: The parsed arguments.
+    :param ArgumentParser parser: The parser, to report errors with.
+    :return string | None: The key, or None if it was not given.
+    """
+    if args.key is not None:
+        return args.key
+    if args.key_file is not None:
+        try:
+            key = Cryptography.read(args.key_file)
+        except OSError as e:
+            parser.error(f"Cannot read key file '{args.key_file}': "
+                         f"{e.strerror}")
+        return key[:-1] if key.endswith("\n") else key
+    return os.environ.get(KEY_ENV)
+
+
+def prompt(parser, name, message):
+    """
+    Asks for a value that was not given on the command line, which is only
+    done when attached to a terminal.
+
+    :param ArgumentParser parser: The parser, to report errors with.
+    :param string name: The name of the missing value.
+    :param string message: The prompt, or None if the property setter for
+           the value prompts by itself.
+    :return string | None: The value entered.
+    """
+    if not sys.stdin.isatty():
+        parser.error(f"the {name} is required when not run from a terminal")
+    return input(message) if message is not None else None
+
+
+def main(argv=None):
+    """
+    Beginning of the program.
+
+    :param list argv: The command line arguments, defaults to sys.argv.
+    :return None:
+    """
+    parser = argparse.ArgumentParser(prog="text_cryptography",
+                                     description="A text encryption/"
+                                                 "decryption program")
+    parser.add_argument("file", nargs='?',
+                        help="the file to encrypt/decrypt, or '-' for stdin")
+    parser.add_argument("-o", "--output",
+                        help="the file to write to, or '-' for stdout "
+                             "(default: Method_Typeed.txt)")
+    parser.add_argument("-m", "--method", type=str.upper,
+                        choices=list(METHOD_NAMES),
+                        help="C (caesar), M (monoalphabetic) or "
+                             "P (polyalphabetic)")
+    parser.add_argument("-t", "--type", type=str.upper, choices=['E', 'D'],
+                        help="E (encrypt) or D (decrypt)")
+    parser.add_argument("-c", "--chain", nargs=3, action="append",
+                        metavar=("METHOD", "TYPE", "KEY"),
+                        help="a stage of a chain of ciphers run in one pass, "
+                             "repeat for each stage in order, instead of "
+                             "--method and --key, e.g. -c C E 5 -c M E key")
+    keys = parser.add_mutually_exclusive_group()
+    keys.add_argument("-k", "--key",
+                      help=f"the key, also read from ${KEY_ENV}")
+    keys.add_argument("--key-file",
+                      help="read the key from this file, without its "
+                           "trailing newline")
+    parser.add_argument("-w", "--workers", type=positive_integer, default=1,
+                        help="the number of processes to encrypt/decrypt "
+                             "with (default: 1)")
+    parser.add_argument("-b", "--backend", choices=BACKENDS,
+                        default="python",
+                        help="transform with pure python or with NumPy "
+                             "arrays (default: python)")
+    parser.add_argument("--binary", action="store_true",
+                        help="read and write the file as bytes, skipping "
+                             "decoding and newline translation")
+    parser.add_argument("--mmap", action="store_true",
+                        help="encrypt/decrypt the file as bytes through "
+                             "memory maps, for very large files")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only encrypt/decrypt what was appended to the "
+                             "file since the last incremental run")
+    ranges = parser.add_mutually_exclusive_group()
+    ranges.add_argument("--range", nargs=2, type=int,
+                        metavar=("OFFSET", "LENGTH"),
+                        help="only encrypt/decrypt LENGTH bytes from OFFSET, "
+                             "written to stdout unless --output is given")
+    ranges.add_argument("--lines", nargs=2, type=int,
+                        metavar=("FIRST", "COUNT"),
+                        help="only encrypt/decrypt COUNT lines from line "
+                             "FIRST, counted from 1, written to stdout "
+                             "unless --output is given")
+    parser.add_argument("--index", action="store_true",
+                        help="with --lines, find the lines with a line index "
+                             "saved next to the file, built on first use")
+    parser.add_argument("-i", "--invalid", choices=POLICIES, default="skip",
+                        help="what to do with characters that cannot be "
+                             "encrypted: fail, skip them or pass them "
+                             "through unchanged (default: skip)")
+    parser.add_argument("--profile", action="store_true",
+                        help="print the time, data and cache hits of each "
+                             "stage to stderr")
+    parser.add_argument("--metrics",
+                        help="save the time, data and cache hits of each "
+                             "stage as JSON to this file")
+    args = parser.parse_args(argv)
+
+    file = args.file or prompt(parser, "file", "Enter a file: ")
+    if file != '-' and not Check.file_exists(file):
+        parser.error(f"File '{file}' does not exist")
+    if '-' in (file, args.output) and (args.mmap or args.incremental):
+        parser.error("--mmap and --incremental need files, not stdin/stdout")
+    if args.range or args.lines:
+        if file == '-':
+            parser.error("--range and --lines need a file, not stdin")
+        if min(args.range or args.lines) < (0 if args.range else 1):
+            parser.error("--range needs a positive offset and length, "
+                         "--lines a first line from 1 and positive count")
+        args.output = args.output or '-'
+
+    if args.chain and (args.method or args.key or args.key_file):
+        parser.error("--chain replaces --method, --key and --key-file")
+    file_data = Cryptography(file, crypt_method=CHAIN if args.chain else None,
+                             workers=args.workers, backend=args.backend,
+                             policy=args.invalid)
+
+    file_data.crypt_type = args.type or prompt(
+        parser, "type", "Please enter 'E' to encrypt or 'D' to decrypt\n>> ")
+    crypt_type = file_data.crypt_type
+
+    if args.chain:
+        try:
+            file_data.key = parse_chain(args.chain)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        file_data.crypt_method = args.method or prompt(parser, "method", None)
+        key = read_key(args, parser)
+        if key is None:
+            key = prompt(parser, "key",
+                         "Please enter a key for your data\n>> ")
+        else:
+            try:
+                key = parse_key(file_data.crypt_method, key)
+            except ValueError as e:
+                parser.error(str(e))
+        file_data.key = key
 
-    print(f"crypt_method: {file_data.crypt_method}")
-    new_data = file_data.crypt_methods[file_data.crypt_method]()
+    # Messages go to stderr when the data itself goes to stdout
+    out = sys.stderr if args.output == '-' else sys.stdout
+    print(f"crypt_method: {file_data.crypt_method}", file=out)
 
-    crypt_methods = defaultdict(str,
-                                {'C': "Caesar",
-                                 'M': "Monoalphabetic",
-                                 'P': "Polyalphabetic"})
+    crypt_methods = defaultdict(str, METHOD_NAMES)
+    crypt_methods[CHAIN] = "Chain"
 
     if DEBUG is False:
         crypt_method = crypt_methods[file_data.crypt_method]
-        new_file_name = f"{crypt_method}_{crypt_type.capitalize()}ed.txt"
-        logger.info(f"{type(new_data)}: {new_data}")
-        Cryptography.write(new_file_name, new_data)
-        print(f"Your new {crypt_type}ed file has been created as " +
-              f"{new_file_name}.")
+        new_file_name = args.output or \
+            f"{crypt_method}_{crypt_type.capitalize()}ed.txt"
+        try:
+            if args.range or args.lines:
+                if args.range:
+                    data = file_data.crypt_range(*args.range)
+                else:
+                    index_file = file + INDEX_SUFFIX if args.index else None
+                    if args.index and file_data.read_index(index_file) is None:
+                        file_data.index_lines(index_file)
+                    data = file_data.crypt_lines(args.lines[0] - 1,
+                                                 args.lines[1], index_file)
+                with open_stream(new_file_name, 'wb') as f:
+                    f.write(data)
+            elif '-' in (file, new_file_name):
+                binary = 'b' if args.binary else ''
+                with open_stream(file, 'r' + binary) as in_file, \
+                        open_stream(new_file_name, 'w' + binary) as out_file:
+                    file_data.crypt_stream(in_file, out_file)
+            elif args.mmap:
+                file_data.crypt_mmap(new_file_name)
+            elif args.incremental:
+                file_data.crypt_incremental(new_file_name)
+            else:
+                file_data.crypt_file(new_file_name, binary=args.binary)
+        except InvalidCharacterError as e:
+            if new_file_name != '-' and os.path.exists(new_file_name):
+                os.remove(new_file_name)
+            print(e, file=sys.stderr)
+            raise SystemExit(EXIT_FAILURE)
+        except OSError as e:
+            print(f"{e.filename}: {e.strerror}", file=sys.stderr)
+            raise SystemExit(EXIT_FAILURE)
+        if args.profile:
+            print(file_data.stats.report(), file=sys.stderr)
+        if args.metrics:
+            file_data.stats.dump(args.metrics)
+        if new_file_name != '-':
+            print(f"Your new {crypt_type}ed file has been created as " +
+                  f"{new_file_name}.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,237 @@
+import os
+import glob
+import time
+import argparse
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from text_cryptography.cipher import METHOD_NAMES, Cipher, parse_key
+from text_cryptography.__main__ import (CHUNK_SIZE, Cryptography,
+                                        positive_integer)
+
+# The compiled cipher shared by every file a worker process handles
+_cipher = None
+
+
+def find_files(path, cipher=None):
+    """
+    Finds the files to encrypt/decrypt from a directory or a glob pattern.
+    Given the cipher, files named like its own output files are left out, so
+    that running the same batch again does not encrypt the last run's
+    output.
+
+    :param string path: A directory or glob pattern.
+    :param Cipher cipher: The compiled cipher of the run.
+    :return list: The matching files, sorted by name.
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, '*')
+    files = (file for file in glob.glob(path) if os.path.isfile(file))
+    if cipher is not None:
+        suffix = output_suffix(cipher)
+        files = (file for file in files
+                 if not os.path.splitext(file)[0].endswith(suffix))
+    return sorted(files)
+
+
+def output_suffix(cipher):
+    """
+    Gets the suffix added to the name of each file the cipher writes.
+
+    :param Cipher cipher: The compiled cipher.
+    :return string: The suffix, before the extension.
+    """
+    crypt_method = METHOD_NAMES[cipher.crypt_method]
+    crypt_type = cipher.crypt_type.capitalize()
+    return f"_{crypt_method}_{crypt_type}ed"
+
+
+def output_file(file, cipher, output_dir=None):
+    """
+    Gets the name of the file to write the encrypted/decrypted file to.
+
+    :param string file: The file being encrypted/decrypted.
+    :param Cipher cipher: The compiled cipher.
+    :param string output_dir: An optional directory for the output file,
+           defaults to the directory of the file.
+    :return string: The output file.
+    """
+    directory, name = os.path.split(file)
+    stem, extension = os.path.splitext(name)
+    name = f"{stem}{output_suffix(cipher)}{extension}"
+    return os.path.join(output_dir or directory, name)
+
+
+def crypt_file(file, new_file, cipher=None, chunk_size=CHUNK_SIZE):
+    """
+    Encrypts or decrypts a file in chunks. Invalid characters are counted and
+    left out of the new file.
+
+    :param string file: The file to encrypt/decrypt.
+    :param string new_file: The file to write to.
+    :param Cipher cipher: The compiled cipher, defaults to the one the worker
+           process was started with.
+    :param integer chunk_size: The number of characters in each chunk.
+    :return tuple: The file, new file, characters read, invalid characters
+            and the seconds taken.
+    """
+    cipher = cipher or _cipher
+    start = time.perf_counter()
+    offset = position = invalid_count = 0
+    with open(new_file, 'w') as f:
+        for chunk in Cryptography.read_chunks(file, chunk_size):
+            data, invalid = crypt_chunk(cipher, chunk, position)
+            f.write(data)
+            offset += len(chunk)
+            position += len(data)
+            invalid_count += invalid
+    return file, new_file, offset, invalid_count, time.perf_counter() - start
+
+
+def crypt_chunk(cipher, chunk, offset=0):
+    """
+    Encrypts or decrypts a chunk of a file, leaving out invalid characters
+    before the transform so that they use up no key positions.
+
+    :param Cipher cipher: The compiled cipher.
+    :param string chunk: The chunk to encrypt/decrypt.
+    :param integer offset: The key position of the chunk, the number of
+           characters written before it.
+    :return tuple: The encrypted/decrypted chunk and the number of invalid
+            characters left out of it.
+    """
+    invalid = Cipher.invalid_characters(chunk)
+    if not invalid:
+        return cipher.transform(chunk, offset), 0
+    data = chunk.translate(dict.fromkeys(map(ord, invalid)))
+    return cipher.transform(data, offset), len(chunk) - len(data)
+
+
+def _init_worker(cipher):
+    """
+    Keeps the compiled cipher in the worker process for every file it handles.
+
+    :param Cipher cipher: The compiled cipher.
+    :return None:
+    """
+    global _cipher
+    _cipher = cipher
+
+
+def crypt_files(files, cipher, output_dir=None, workers=None,
+                chunk_size=CHUNK_SIZE):
+    """
+    Encrypts or decrypts every file with one compiled cipher over a process
+    pool.
+
+    :param list files: The files to encrypt/decrypt.
+    :param Cipher cipher: The compiled cipher.
+    :param string output_dir: An optional directory for the new files.
+    :param integer workers: The number of processes, defaults to the number
+           of CPUs.
+    :param integer chunk_size: The number of characters in each chunk.
+    :return generator: The result of each file, in order.
+    """
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    new_files = [output_file(file, cipher, output_dir) for file in files]
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(cipher,)) as executor:
+        yield from executor.map(partial(crypt_file, chunk_size=chunk_size),
+                                files, new_files)
+
+
+def summary(result):
+    """
+    Describes the result of encrypting/decrypting a file.
+
+    :param tuple result: The file, new file, characters read, invalid
+           characters and the seconds taken.
+    :return string: The summary.
+    """
+    file, new_file, chars, invalid, seconds = result
+    message = f"{file} -> {new_file}: {chars} characters in {seconds:.3f}s"
+    if invalid:
+        message += f" ({invalid} invalid characters skipped)"
+    return message
+
+
+def total_summary(files, chars, seconds):
+    """
+    Describes the throughput of the whole batch.
+
+    :param integer files: The number of files.
+    :param integer chars: The number of characters read.
+    :param float seconds: The seconds taken.
+    :return string: The summary.
+    """
+    return f"{files} files, {chars} characters in {seconds:.3f}s " \
+        f"({chars / seconds / 1024 ** 2:.2f} MB/s)"
+
+
+def argument_parser(prog, description):
+    """
+    Creates a parser for the arguments shared by the batch entry points.
+
+    :param string prog: The name of the program.
+    :param string description: The description of the program.
+    :return ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    parser.add_argument("path", help="a directory or glob pattern")
+    parser.add_argument("-m", "--method", required=True,
+                        type=str.upper, choices=list(METHOD_NAMES),
+                        help="C (caesar), M (monoalphabetic) or "
+                             "P (polyalphabetic)")
+    parser.add_argument("-t", "--type", required=True, type=str.upper,
+                        choices=['E', 'D'], help="E (encrypt) or D (decrypt)")
+    parser.add_argument("-k", "--key", required=True, help="the key")
+    parser.add_argument("-o", "--output-dir",
+                        help="write new files here instead of next to the "
+                             "input files")
+    return parser
+
+
+def parse_args(parser):
+    """
+    Parses the command line and compiles the cipher and list of files from
+    it, exiting with a usage message if they are invalid.
+
+    :param ArgumentParser parser: The parser from argument_parser.
+    :return tuple: The arguments, the compiled cipher and the files.
+    """
+    args = parser.parse_args()
+    try:
+        key = parse_key(args.method, args.key)
+    except ValueError as e:
+        parser.error(str(e))
+    crypt_type = "encrypt" if args.type == 'E' else "decrypt"
+    cipher = Cipher(args.method, key, crypt_type)
+
+    files = find_files(args.path, cipher)
+    if not files:
+        parser.error(f"No files found in '{args.path}'")
+    return args, cipher, files
+
+
+def main():
+    """ Encrypts/decrypts a batch of files without any prompts. """
+    parser = argument_parser(
+        "text_cryptography.batch",
+        "Encrypt or decrypt every file in a directory or glob")
+    parser.add_argument("-w", "--workers", type=positive_integer,
+                        help="the number of processes (default: CPU count)")
+    args, cipher, files = parse_args(parser)
+
+    start = time.perf_counter()
+    total_chars = 0
+    for result in crypt_files(files, cipher, args.output_dir, args.workers):
+        total_chars += result[2]
+        print(summary(result))
+    seconds = time.perf_counter() - start
+
+    print(total_summary(len(files), total_chars, seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from text_cryptography.cipher import BACKENDS, CHARS, METHOD_NAMES
+from text_cryptography.__main__ import Cryptography
+
+SIZES = ("1K", "10K", "100K", "1M", "10M")
+KEY_LENGTHS = (4, 16, 64)
+UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+def parse_size(size):
+    """
+    Converts a size such as '10K' or '100M' to a number of characters.
+
+    :param string size: The size, with an optional K, M or G suffix.
+    :return integer: The number of characters.
+    """
+    size = size.strip().upper()
+    if size[-1:] in UNITS:
+        return int(float(size[:-1]) * UNITS[size[-1]])
+    return int(size)
+
+
+def generate_text(size, seed=0):
+    """
+    Generates reproducible text made of characters from CHARS.
+
+    :param integer size: The number of characters.
+    :param integer seed: The random seed.
+    :return string: The text.
+    """
+    block = "".join(random.Random(seed).choices(CHARS, k=min(size, 1024 ** 2)))
+    return (block * (size // len(block) + 1))[:size]
+
+
+def generate_key(crypt_method, key_length, seed=0):
+    """
+    Generates a reproducible key for the method.
+
+    :param string crypt_method: The method of cryptography.
+    :param integer key_length: The number of characters in the key.
+    :param integer seed: The random seed.
+    :return string | integer: The key.
+    """
+    rng = random.Random(seed)
+    if crypt_method == 'C':
+        return rng.randrange(1, 95)
+    return "".join(rng.choices(CHARS, k=key_length))
+
+
+def run(crypt, repeat):
+    """
+    Times the cipher method of the Cryptography object, then runs it once more
+    to measure its peak memory.
+
+    :param Cryptography crypt: The Cryptography object to run.
+    :param integer repeat: The number of timed runs, the fastest is kept.
+    :return tuple: The fastest time in seconds and the peak memory in bytes.
+    """
+    method = crypt.crypt_methods[crypt.crypt_method]
+    crypt.file_data
+
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        method()
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    method()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(seconds), peak_memory
+
+
+def benchmark(sizes=SIZES, key_lengths=KEY_LENGTHS, crypt_methods="CMP",
+              repeat=3, backend="python", seed=0):
+    """
+    Benchmarks every method in both directions for each size and key length.
+
+    The caesar cipher has a single key, so it is only run once per size.
+
+    :param iterable sizes: The sizes of the generated text.
+    :param iterable key_lengths: The lengths of the generated keys.
+    :param string crypt_methods: The methods of cryptography to benchmark.
+    :param integer repeat: The number of timed runs for each result.
+    :param string backend: Either 'python' or 'numpy'.
+    :param integer seed: The random seed for the text and keys.
+    :return generator: A dict for each result.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            file = os.path.join(directory, f"{size}.txt")
+            characters = parse_size(size)
+            Cryptography.write(file, generate_text(characters, seed))
+
+            for crypt_method in crypt_methods:
+                for key_length in (key_lengths if crypt_method != 'C'
+                                   else [None]):
+                    key = generate_key(crypt_method, key_length, seed)
+                    for crypt_type in ("encrypt", "decrypt"):
+                        crypt = Cryptography(file, crypt_type, crypt_method,
+                                             key, backend=backend)
+                        seconds, peak_memory = run(crypt, repeat)
+                        yield {
+                            "method": METHOD_NAMES[crypt_method],
+                            "crypt_type": crypt_type,
+                            "size": characters,
+                            "key_length": key_length,
+                            "seconds": seconds,
+                            "mb_per_second": characters / seconds / 1024 ** 2,
+                            "peak_memory": peak_memory}
+
+
+def main():
+    """ Runs the benchmarks and reports the results. """
+    parser = argparse.ArgumentParser(
+        prog="text_cryptography.benchmark",
+        description="Benchmark each cipher, direction and input size")
+    parser.add_argument("-s", "--sizes", default=",".join(SIZES),
+                        help="comma separated sizes, from 1K up to 100M "
+                             f"(default: {','.join(SIZES)})")
+    parser.add_argument("-k", "--key-lengths",
+                        default=",".join(map(str, KEY_LENGTHS)),
+                        help="comma separated key lengths "
+                             f"(default: {','.join(map(str, KEY_LENGTHS))})")
+    parser.add_argument("-m", "--methods", default="CMP", type=str.upper,
+                        help="the methods to benchmark (default: CMP)")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="timed runs per result, the fastest is kept "
+                             "(default: 3)")
+    parser.add_argument("-b", "--backend", choices=BACKENDS,
+                        default="python")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output",
+                        help="save the results as JSON to this file")
+    args = parser.parse_args()
+
+    sizes = args.sizes.split(",")
+    key_lengths = [int(length) for length in args.key_lengths.split(",")]
+
+    results = []
+    print(f"{'method':<16}{'type':<9}{'size':>11}{'key':>5}"
+          f"{'seconds':>11}{'MB/s':>10}{'peak MB':>10}")
+    for result in benchmark(sizes, key_lengths, args.methods, args.repeat,
+                            args.backend, args.seed):
+        results.append(result)
+        print(f"{result['method']:<16}{result['crypt_type']:<9}"
+              f"{result['size']:>11}{result['key_length'] or '-':>5}"
+              f"{result['seconds']:>11.4f}{result['mb_per_second']:>10.2f}"
+              f"{result['peak_memory'] / 1024 ** 2:>10.2f}")
+
+    if args.output:
+        report = {"python": sys.version.split()[0],
+                  "platform": platform.platform(),
+                  "backend": args.backend,
+                  "repeat": args.repeat,
+                  "seed": args.seed,
+                  "results": results}
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,724 @@
+import re
+import string
+import hashlib
+import threading
+from math import gcd
+from functools import reduce
+from collections import OrderedDict, namedtuple
+from itertools import cycle, islice, repeat
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+CHARS = string.ascii_letters + string.digits + string.punctuation + " \n"
+CHAR_BYTES = CHARS.encode('ascii')
+INDEX = {char: index for index, char in enumerate(CHARS)}
+INVALID = re.compile(f"[^{re.escape(CHARS)}]")
+INVALID_BYTES = re.compile(b"[^" + re.escape(CHAR_BYTES) + b"]")
+METHOD_NAMES = {'C': "Caesar", 'M': "Monoalphabetic", 'P': "Polyalphabetic"}
+BACKENDS = ("python", "numpy")
+CACHE_SIZE = 128
+# The number of messages in each batch sent to an executor by crypt_many
+BATCH_SIZE = 4096
+# The method of a chain of ciphers, whose key is its stages
+CHAIN = "CHAIN"
+CRYPT_TYPES = {'E': "encrypt", 'D': "decrypt"}
+INVERSE = {"encrypt": "decrypt", "decrypt": "encrypt"}
+# The longest period a chain is fused into one set of tables for, longer
+# chains apply their ciphers one after another to each chunk instead
+MAX_PERIOD = 4096
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class InvalidCharacterError(ValueError):
+
+    def __init__(self, invalid, file=None):
+        """
+        Raised when data has characters that are not in CHARS and the invalid
+        character policy is 'strict'.
+
+        :param list invalid: The (offset, character) of each invalid
+               character.
+        :param string file: The file the data is from.
+        """
+        self.invalid = invalid
+        self.file = file
+        offset, character = invalid[0]
+        source = f" in file {file}" if file else ""
+        super().__init__(f"{len(invalid)} invalid characters{source}, the "
+                         f"first is {character!r} at {offset}.")
+
+
+class Cipher:
+
+    def __init__(self, crypt_method, key, crypt_type, backend="python"):
+        """
+        Compiles the translation tables for a method, key and cryptography
+        type so that text can be transformed without per-character lookups.
+
+        :param string crypt_method: The method of cryptography ('C', 'M', 'P').
+        :param string | integer key: The key for the method.
+        :param string crypt_type: Either 'encrypt' or 'decrypt'.
+        :param string backend: Either 'python' or 'numpy'. The numpy backend
+               is used for polyalphabetic keys, as translate is already
+               faster for a single table, and falls back to python when NumPy
+               is not installed.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"backend was: {backend}")
+        if crypt_type not in ("encrypt", "decrypt"):
+            raise ValueError(f"crypt_type was: {crypt_type}")
+        if crypt_method == 'C' and (type(key) is not int or
+                                    key not in range(0, 95)):
+            raise ValueError(f"Key {key!r} is invalid, the caesar key must "
+                             f"be an integer between 0 and 94")
+
+        self.crypt_method = crypt_method
+        self.key = key
+        self.crypt_type = crypt_type
+        self.backend = backend
+
+        if crypt_method == 'C':
+            self.shifts = [key]
+            self.tables = [self.shift_table(key, crypt_type)]
+        elif crypt_method == 'M':
+            self.shifts = [0]
+            self.tables = [self.substitution_table(key, crypt_type)]
+        elif crypt_method == 'P':
+            self.shifts = self.shift_sequence(key)
+            shift_tables = {shift: self.shift_table(shift, crypt_type)
+                            for shift in set(self.shifts)}
+            self.tables = [shift_tables[shift] for shift in self.shifts]
+        else:
+            raise ValueError(f"crypt_method was: {crypt_method}")
+
+        self.compile_tables()
+
+    def compile_tables(self):
+        """
+        Converts the translation tables to byte tables, and to arrays for the
+        numpy backend, converting each distinct table only once.
+
+        :return None:
+        """
+        byte_tables = {id(table): self.byte_table(table)
+                       for table in self.tables}
+        self.byte_tables = [byte_tables[id(table)] for table in self.tables]
+
+        if self.backend == "numpy" and numpy is not None:
+            array_tables = {id(table): numpy.frombuffer(table, numpy.uint8)
+                            for table in self.byte_tables}
+            self.array_tables = [array_tables[id(table)]
+                                 for table in self.byte_tables]
+
+    @property
+    def period(self):
+        """
+        Gets the number of characters before the tables repeat.
+
+        :return integer: The period of the cipher.
+        """
+        return len(self.tables)
+
+    @property
+    def fingerprint(self):
+        """
+        Gets a short hash of the method and key, so that a key can be checked
+        without being stored.
+
+        :return string: The fingerprint.
+        """
+        key = f"{self.crypt_method}:{self.key!r}".encode()
+        return hashlib.sha256(key).hexdigest()[:16]
+
+    def key_stream(self, offset=0):
+        """
+        Lazily yields the shift for each position of the data, starting at the
+        offset.
+
+        :param integer offset: The position in the data to start from.
+        :return iterator: The shift for each position.
+        """
+        return islice(cycle(self.shifts), offset % self.period, None)
+
+    def transform(self, text, offset=0):
+        """
+        Encrypts or decrypts the text in a single pass over the tables.
+
+        Characters that are not in CHARS are passed through unchanged.
+
+        :param string | bytes text: The text to transform.
+        :param integer offset: The position of the text in the whole data,
+               used to carry the key position across chunks.
+        :return string | bytes: The encrypted/decrypted text, of the same
+                type as the text.
+        """
+        if isinstance(text, (bytes, bytearray)):
+            return self.transform_bytes(text, offset)
+
+        if self.period == 1:
+            return text.translate(self.tables[0])
+
+        if text.isascii():
+            return self.transform_bytes(text.encode('ascii'),
+                                        offset).decode('ascii')
+
+        data = list(text)
+        for position, table in enumerate(self.tables):
+            start = (position - offset) % self.period
+            data[start::self.period] = \
+                text[start::self.period].translate(table)
+        return "".join(data)
+
+    def transform_many(self, messages, offsets=None):
+        """
+        Encrypts or decrypts many messages in a single pass, by joining them
+        into one buffer, transforming it and splitting it again. Each message
+        is padded to start at its own key position in the buffer, so every
+        message comes out as if it was transformed on its own.
+
+        :param iterable messages: The strings or bytes to transform, all of
+               the same type.
+        :param iterable offsets: The position of each message in its whole
+               data, defaults to 0 for every message.
+        :return list: The encrypted/decrypted messages, in order.
+        """
+        messages = list(messages)
+        if not messages:
+            return []
+        if offsets is None:
+            offsets = [0] * len(messages)
+        else:
+            offsets = list(offsets)
+            if len(offsets) != len(messages):
+                raise ValueError(f"{len(offsets)} offsets were given for "
+                                 f"{len(messages)} messages")
+
+        space = b" " if isinstance(messages[0], bytes) else " "
+        padding = space * (self.period - 1)
+        parts = []
+        starts = []
+        position = 0
+        for message, offset in zip(messages, offsets):
+            pad = (offset - position) % self.period
+            if pad:
+                parts.append(padding[:pad])
+                position += pad
+            parts.append(message)
+            starts.append(position)
+            position += len(message)
+
+        data = self.transform(padding[:0].join(parts))
+        return [data[start:start + len(message)]
+                for start, message in zip(starts, messages)]
+
+    def transform_bytes(self, data, offset=0):
+        """
+        Encrypts or decrypts bytes with bytes.translate, using one 256 byte
+        table for each key position so that every loop runs in C.
+
+        Bytes that are not in CHARS are passed through unchanged.
+
+        :param bytes data: The bytes to transform.
+        :param integer offset: The position of the bytes in the whole data.
+        :return bytes: The encrypted/decrypted bytes.
+        """
+        if self.period == 1:
+            return data.translate(self.byte_tables[0])
+
+        if self.backend == "numpy" and numpy is not None:
+            return self.transform_array(data, offset)
+
+        new_data = bytearray(data)
+        for position, table in enumerate(self.byte_tables):
+            start = (position - offset) % self.period
+            new_data[start::self.period] = \
+                data[start::self.period].translate(table)
+        return bytes(new_data)
+
+    def transform_array(self, data, offset=0):
+        """
+        Encrypts or decrypts bytes with NumPy, gathering each key position's
+        bytes through its byte table in one array operation.
+
+        Bytes that are not in CHARS are passed through unchanged.
+
+        :param bytes data: The bytes to transform.
+        :param integer offset: The position of the bytes in the whole data.
+        :return bytes: The encrypted/decrypted bytes.
+        """
+        data = numpy.frombuffer(data, dtype=numpy.uint8)
+        if self.period == 1:
+            return self.array_tables[0][data].tobytes()
+
+        new_data = numpy.empty_like(data)
+        for position, table in enumerate(self.array_tables):
+            start = (position - offset) % self.period
+            new_data[start::self.period] = table[data[start::self.period]]
+        return new_data.tobytes()
+
+    @staticmethod
+    def byte_table(table):
+        """
+        Converts a translation table to a 256 byte table for bytes.translate.
+        Bytes that are not in the table keep their value.
+
+        :param dict table: The translation table.
+        :return bytes: The byte table.
+        """
+        return bytes(table.get(byte, byte) for byte in range(256))
+
+    @staticmethod
+    def shift_table(shift, crypt_type):
+        """
+        Builds a table that shifts each character along CHARS.
+
+        :param integer shift: The number of places to shift each character.
+        :param string crypt_type: Either 'encrypt' or 'decrypt'.
+        :return dict: The translation table.
+        """
+        shift = shift if crypt_type == "encrypt" else -shift
+        shift %= len(CHARS)
+        return str.maketrans(CHARS, CHARS[shift:] + CHARS[:shift])
+
+    @staticmethod
+    def substitution_table(key, crypt_type):
+        """
+        Builds a monoalphabetic table from the key.
+
+        The unique characters of the key are moved to the front of the
+        alphabet, at the position they appear in the key.
+
+        :param string key: The key to build the alphabet from.
+        :param string crypt_type: Either 'encrypt' or 'decrypt'.
+        :return dict: The translation table.
+        """
+        cipher_text = list(CHARS)
+        for index, key_char in enumerate(dict.fromkeys(key)):
+            if key_char in CHARS:
+                cipher_text.remove(key_char)
+                cipher_text.insert(index, key_char)
+        cipher_text = "".join(cipher_text)
+
+        if crypt_type == "encrypt":
+            return str.maketrans(cipher_text, CHARS)
+        return str.maketrans(CHARS, cipher_text)
+
+    @staticmethod
+    def shift_sequence(key):
+        """
+        Gets the shift for each character of a polyalphabetic key.
+
+        Characters that are not in CHARS are ignored, and a key without any
+        valid characters is rejected, since it would leave the text
+        unchanged.
+
+        :param string key: The polyalphabetic key.
+        :return list: The shift for each key position.
+        """
+        sequence = [INDEX[key_char] for key_char in key if key_char in INDEX]
+        if not sequence:
+            raise ValueError(f"Key {key!r} is invalid, the polyalphabetic "
+                             f"key must have at least one character of "
+                             f"CHARS")
+        return sequence
+
+    @staticmethod
+    def invalid_characters(text):
+        """
+        Finds the characters in the text that are not in CHARS.
+
+        :param string | bytes text: The text to check.
+        :return set: The invalid characters, or byte values for bytes.
+        """
+        if isinstance(text, (bytes, bytearray)):
+            return set(text.translate(None, CHAR_BYTES))
+        return set(text).difference(CHARS)
+
+    @staticmethod
+    def find_invalid(text, offset=0):
+        """
+        Finds every character in the text that is not in CHARS, and where it
+        is, in one scan.
+
+        :param string | bytes text: The text to check.
+        :param integer offset: The position of the text in the whole data.
+        :return list: The (offset, character) of each invalid character.
+        """
+        if isinstance(text, (bytes, bytearray)):
+            return [(offset + match.start(), match.group().decode('latin-1'))
+                    for match in INVALID_BYTES.finditer(text)]
+        return [(offset + match.start(), match.group())
+                for match in INVALID.finditer(text)]
+
+
+class Chain(Cipher):
+
+    def __init__(self, stages, crypt_type="encrypt", backend="python"):
+        """
+        Compiles ciphers applied one after another into a single cipher, so
+        that the whole chain runs in one pass over the data. Every cipher is
+        a permutation of CHARS for each key position, so the permutations of
+        the stages are composed ahead of time for each position of the
+        chain's period, the least common multiple of the stages' periods.
+
+        :param iterable stages: The (crypt_method, key, crypt_type) of each
+               cipher, in the order they are applied.
+        :param string crypt_type: 'encrypt' applies the stages, 'decrypt'
+               undoes them.
+        :param string backend: Either 'python' or 'numpy'.
+        """
+        stages = tuple(tuple(stage) for stage in stages)
+        if not stages:
+            raise ValueError("A chain needs at least one stage")
+        if crypt_type not in INVERSE:
+            raise ValueError(f"crypt_type was: {crypt_type}")
+
+        self.crypt_method = CHAIN
+        self.key = stages
+        self.crypt_type = crypt_type
+        self.backend = backend
+
+        if crypt_type == "encrypt":
+            self.ciphers = [Cipher(*stage, backend) for stage in stages]
+        else:
+            self.ciphers = [Cipher(method, key, INVERSE[stage_type], backend)
+                            for method, key, stage_type in reversed(stages)]
+        self._period = reduce(lambda period, cipher: period * cipher.period //
+                              gcd(period, cipher.period), self.ciphers, 1)
+
+        self.tables = []
+        if self._period <= MAX_PERIOD:
+            tables = {}
+            for position in range(self._period):
+                alphabet = CHARS
+                for cipher in self.ciphers:
+                    alphabet = alphabet.translate(
+                        cipher.tables[position % cipher.period])
+                if alphabet not in tables:
+                    tables[alphabet] = str.maketrans(CHARS, alphabet)
+                self.tables.append(tables[alphabet])
+            self.compile_tables()
+
+    @property
+    def period(self):
+        """
+        Gets the number of characters before the chain repeats.
+
+        :return integer: The period of the chain.
+        """
+        return self._period
+
+    def transform(self, text, offset=0):
+        """
+        Encrypts or decrypts the text in a single pass over the fused tables,
+        or with each cipher in turn if the period was too long to fuse.
+
+        :param string | bytes text: The text to transform.
+        :param integer offset: The position of the text in the whole data.
+        :return string | bytes: The encrypted/decrypted text.
+        """
+        if self.tables:
+            return super().transform(text, offset)
+        for cipher in self.ciphers:
+            text = cipher.transform(text, offset)
+        return text
+
+
+class CipherCache:
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        """
+        A thread-safe, least recently used cache of compiled ciphers, so that
+        keys which are used again never pay the cost of compiling them.
+
+        :param integer maxsize: The number of keys to keep.
+        """
+        self._maxsize = maxsize
+        self._ciphers = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        """
+        Gets the number of keys the cache keeps.
+
+        :return integer: The size of the cache.
+        """
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value):
+        """
+        Sets the number of keys the cache keeps, dropping the least recently
+        used ones if there are now too many.
+
+        :param integer value: The size of the cache.
+        :return None:
+        """
+        if value < 0:
+            raise ValueError(f"maxsize was: {value}")
+        with self._lock:
+            self._maxsize = value
+            while len(self._ciphers) > value:
+                self._ciphers.popitem(last=False)
+
+    def get(self, crypt_method, key, crypt_type, backend="python"):
+        """
+        Gets the compiled cipher for the key, compiling both the encryption
+        and decryption ciphers when the key is not in the cache.
+
+        :param string crypt_method: The method of cryptography ('C', 'M', 'P').
+        :param string | integer key: The key for the method.
+        :param string crypt_type: Either 'encrypt' or 'decrypt'.
+        :param string backend: Either 'python' or 'numpy'.
+        :return Cipher: The compiled cipher.
+        """
+        if crypt_method == CHAIN:
+            key = tuple(tuple(stage) for stage in key)
+        cache_key = (crypt_method, key, backend)
+        with self._lock:
+            ciphers = self._ciphers.get(cache_key)
+            if ciphers is not None:
+                self.hits += 1
+                self._ciphers.move_to_end(cache_key)
+                return ciphers[crypt_type]
+            self.misses += 1
+
+        if crypt_method == CHAIN:
+            ciphers = {crypt_type: Chain(key, crypt_type, backend)
+                       for crypt_type in ("encrypt", "decrypt")}
+        else:
+            ciphers = {crypt_type: Cipher(crypt_method, key, crypt_type,
+                                          backend)
+                       for crypt_type in ("encrypt", "decrypt")}
+        with self._lock:
+            if self._maxsize > 0:
+                self._ciphers[cache_key] = ciphers
+                while len(self._ciphers) > self._maxsize:
+                    self._ciphers.popitem(last=False)
+        return ciphers[crypt_type]
+
+    def info(self):
+        """
+        Gets the hit and miss statistics of the cache.
+
+        :return CacheInfo: The hits, misses, maximum size and current size.
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self._maxsize,
+                             len(self._ciphers))
+
+    def clear(self):
+        """
+        Removes every cipher from the cache and resets the statistics.
+
+        :return None:
+        """
+        with self._lock:
+            self._ciphers.clear()
+            self.hits = self.misses = 0
+
+
+# The cache of compiled ciphers shared by every Cryptography object
+cipher_cache = CipherCache()
+
+
+def get_cipher(crypt_method, key, crypt_type, backend="python"):
+    """
+    Gets a compiled cipher from the shared cache.
+
+    :param string crypt_method: The method of cryptography ('C', 'M', 'P').
+    :param string | integer key: The key for the method.
+    :param string crypt_type: Either 'encrypt' or 'decrypt'.
+    :param string backend: Either 'python' or 'numpy'.
+    :return Cipher: The compiled cipher.
+    """
+    return cipher_cache.get(crypt_method, key, crypt_type, backend)
+
+
+def transform(crypt_method, key, crypt_type, text, offset=0,
+              backend="python"):
+    """
+    Compiles a cipher and transforms the text with it. This is a module level
+    function so that it can be sent to worker processes.
+
+    :param string crypt_method: The method of cryptography ('C', 'M', 'P').
+    :param string | integer key: The key for the method.
+    :param string crypt_type: Either 'encrypt' or 'decrypt'.
+    :param string text: The text to transform.
+    :param integer offset: The position of the text in the whole data.
+    :param string backend: Either 'python' or 'numpy'.
+    :return string: The encrypted/decrypted text.
+    """
+    cipher = get_cipher(crypt_method, key, crypt_type, backend)
+    return cipher.transform(text, offset)
+
+
+def encrypt(text, crypt_method, key, offset=0):
+    """
+    Encrypts a string or bytes in memory, without any file I/O or prompts.
+    Characters that are not in CHARS are passed through unchanged.
+
+    :param string | bytes text: The text to encrypt.
+    :param string crypt_method: The method of cryptography ('C', 'M', 'P').
+    :param string | integer key: The key for the method.
+    :param integer offset: The position of the text in the whole data.
+    :return string | bytes: The encrypted text.
+    """
+    return get_cipher(crypt_method.upper(), key, "encrypt").transform(text,
+                                                                      offset)
+
+
+def decrypt(text, crypt_method, key, offset=0):
+    """
+    Decrypts a string or bytes in memory, without any file I/O or prompts.
+    Characters that are not in CHARS are passed through unchanged.
+
+    :param string | bytes text: The text to decrypt.
+    :param string crypt_method: The method of cryptography ('C', 'M', 'P').
+    :param string | integer key: The key for the method.
+    :param integer offset: The position of the text in the whole data.
+    :return string | bytes: The decrypted text.
+    """
+    return get_cipher(crypt_method.upper(), key, "decrypt").transform(text,
+                                                                      offset)
+
+
+def parse_key(crypt_method, key):
+    """
+    Checks the key for the method without prompting for a new one.
+
+    :param string crypt_method: The method of cryptography.
+    :param string key: The key entered on the command line.
+    :return string | integer: The key.
+    """
+    if crypt_method == 'P':
+        Cipher.shift_sequence(key)
+    if crypt_method != 'C':
+        return key
+    if not key.isdigit() or int(key) not in range(0, 95):
+        raise ValueError("The caesar key must be an integer between 0 and 94")
+    return int(key)
+
+
+def parse_chain(stages):
+    """
+    Checks the stages of a chain entered on the command line without
+    prompting for new ones.
+
+    :param iterable stages: The (method, type, key) of each stage, with the
+           type as 'E' or 'D'.
+    :return tuple: The (crypt_method, key, crypt_type) of each stage.
+    """
+    chain = []
+    for crypt_method, crypt_type, key in stages:
+        crypt_method, crypt_type = crypt_method.upper(), crypt_type.upper()
+        if crypt_method not in METHOD_NAMES:
+            raise ValueError(f"The method of a stage must be one of "
+                             f"{', '.join(METHOD_NAMES)}, not {crypt_method}")
+        if crypt_type not in CRYPT_TYPES:
+            raise ValueError(f"The type of a stage must be E or D, not "
+                             f"{crypt_type}")
+        chain.append((crypt_method, parse_key(crypt_method, key),
+                      CRYPT_TYPES[crypt_type]))
+    return tuple(chain)
+
+
+def transform_many(crypt_method, key, crypt_type, messages, offsets=None,
+                   backend="python"):
+    """
+    Compiles a cipher and transforms many messages with it in a single pass.
+    This is a module level function so that it can be sent to worker
+    processes.
+
+    :param string crypt_method: The method of cryptography ('C', 'M', 'P').
+    :param string | integer key: The key for the method.
+    :param string crypt_type: Either 'encrypt' or 'decrypt'.
+    :param iterable messages: The strings or bytes to transform.
+    :param iterable offsets: The position of each message in its whole data.
+    :param string backend: Either 'python' or 'numpy'.
+    :return list: The encrypted/decrypted messages.
+    """
+    cipher = get_cipher(crypt_method, key, crypt_type, backend)
+    return cipher.transform_many(messages, offsets)
+
+
+def crypt_many(messages, crypt_method, key, crypt_type, offsets=None,
+               executor=None, batch_size=BATCH_SIZE):
+    """
+    Encrypts or decrypts many messages that share a method and key. The key
+    is compiled once and the messages are transformed a batch at a time,
+    with each batch in a single pass. With an executor, the batches are
+    spread over its threads or processes.
+
+    :param iterable messages: The strings or bytes to transform.
+    :param string crypt_method: The method of cryptography ('C', 'M', 'P').
+    :param string | integer key: The key for the method.
+    :param string crypt_type: Either 'encrypt' or 'decrypt'.
+    :param iterable offsets: The position of each message in its whole data,
+           defaults to 0 for every message.
+    :param Executor executor: An optional thread or process pool.
+    :param integer batch_size: The number of messages in each batch sent to
+           the executor.
+    :return list: The encrypted/decrypted messages, in order.
+    """
+    cipher = get_cipher(crypt_method.upper(), key, crypt_type)
+    if executor is None:
+        return cipher.transform_many(messages, offsets)
+
+    messages = list(messages)
+    offsets = [0] * len(messages) if offsets is None else list(offsets)
+    if len(offsets) != len(messages):
+        raise ValueError(f"{len(offsets)} offsets were given for "
+                         f"{len(messages)} messages")
+    batches = range(0, len(messages), batch_size)
+    results = executor.map(transform_many,
+                           repeat(cipher.crypt_method, len(batches)),
+                           repeat(key, len(batches)),
+                           repeat(crypt_type, len(batches)),
+                           (messages[start:start + batch_size]
+                            for start in batches),
+                           (offsets[start:start + batch_size]
+                            for start in batches))
+    return [message for batch in results for message in batch]
+
+
+def encrypt_many(messages, crypt_method, key, offsets=None, executor=None):
+    """
+    Encrypts many strings or bytes that share a method and key, in memory.
+
+    :param iterable messages: The strings or bytes to encrypt.
+    :param string crypt_method: The method of cryptography ('C', 'M', 'P').
+    :param string | integer key: The key for the method.
+    :param iterable offsets: The position of each message in its whole data,
+           defaults to 0 for every message.
+    :param Executor executor: An optional thread or process pool for large
+           batches.
+    :return list: The encrypted messages.
+    """
+    return crypt_many(messages, crypt_method, key, "encrypt", offsets,
+                      executor)
+
+
+def decrypt_many(messages, crypt_method, key, offsets=None, executor=None):
+    """
+    Decrypts many strings or bytes that share a method and key, in memory.
+
+    :param iterable messages: The strings or bytes to decrypt.
+    :param string crypt_method: The method of cryptography ('C', 'M', 'P').
+    :param string | integer key: The key for the method.
+    :param iterable offsets: The position of each message in its whole data,
+           defaults to 0 for every message.
+    :param Executor executor: An optional thread or process pool for large
+           batches.
+    :return list: The decrypted messages.
+    """
+    return crypt_many(messages, crypt_method, key, "decrypt", offsets,
+                      executor)
@@ -0,0 +1,239 @@
+import os
+import sys
+import json
+import socket
+import struct
+import argparse
+import tempfile
+import threading
+from text_cryptography.cipher import METHOD_NAMES, parse_key
+
+SOCKET = os.path.join(tempfile.gettempdir(), "text_cryptography.sock")
+# Each frame is its length as a 4 byte unsigned big-endian integer, then the
+# frame itself
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME = 256 * 1024 ** 2
+
+
+def frame(payload):
+    """
+    Prefixes the payload with its length.
+
+    :param bytes payload: The payload.
+    :return bytes: The frame.
+    """
+    if len(payload) > MAX_FRAME:
+        raise ValueError(f"Frames are limited to {MAX_FRAME} bytes, the "
+                         f"payload was {len(payload)}")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def request(crypt_method, key, crypt_type, data, offset=0, policy="pass"):
+    """
+    Builds a request, a frame with a JSON header of the cipher followed by a
+    frame with the data.
+
+    :param string crypt_method: The method of cryptography ('C', 'M', 'P').
+    :param string | integer key: The key for the method.
+    :param string crypt_type: Either 'encrypt' or 'decrypt'.
+    :param bytes data: The data to encrypt/decrypt.
+    :param integer offset: The position of the data in the whole data.
+    :param string policy: What the server does with invalid characters,
+           'strict', 'skip' or 'pass'.
+    :return bytes: The request.
+    """
+    header = {"method": crypt_method, "key": key, "type": crypt_type,
+              "offset": offset, "policy": policy}
+    return frame(json.dumps(header).encode()) + frame(data)
+
+
+class Client:
+
+    def __init__(self, path=SOCKET):
+        """
+        A connection to a running server, which keeps the compiled ciphers
+        warm so that each request costs little more than the transform.
+
+        :param string path: The Unix socket the server listens on.
+        """
+        self.path = path
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(path)
+        self.file = self.socket.makefile('rb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Closes the connection.
+
+        :return None:
+        """
+        self.file.close()
+        self.socket.close()
+
+    def read_frame(self):
+        """
+        Reads a frame from the server.
+
+        :return bytes: The payload of the frame.
+        """
+        header = self.file.read(FRAME_HEADER.size)
+        if len(header) < FRAME_HEADER.size:
+            raise ConnectionError("The server closed the connection")
+        size = FRAME_HEADER.unpack(header)[0]
+        payload = self.file.read(size)
+        if len(payload) < size:
+            raise ConnectionError("The server closed the connection")
+        return payload
+
+    def read_response(self):
+        """
+        Reads the response to a request.
+
+        :return bytes: The encrypted/decrypted data.
+        """
+        header = json.loads(self.read_frame().decode())
+        data = self.read_frame()
+        if header.get("error"):
+            raise ValueError(header["error"])
+        return data
+
+    def transform(self, crypt_method, key, crypt_type, text, offset=0,
+                  policy="pass"):
+        """
+        Encrypts or decrypts a string or bytes on the server.
+
+        :param string crypt_method: The method of cryptography ('C', 'M', 'P').
+        :param string | integer key: The key for the method.
+        :param string crypt_type: Either 'encrypt' or 'decrypt'.
+        :param string | bytes text: The text to transform.
+        :param integer offset: The position of the text in the whole data.
+        :param string policy: What to do with invalid characters, 'strict',
+               'skip' or 'pass'.
+        :return string | bytes: The encrypted/decrypted text, of the same
+                type as the text.
+        """
+        return self.transform_many([(crypt_method, key, crypt_type, text,
+                                     offset, policy)])[0]
+
+    def transform_many(self, requests):
+        """
+        Sends every request before the responses are read, so that the
+        requests are pipelined instead of paying a round trip each. The
+        requests are sent from a thread so that neither end blocks on a full
+        socket buffer. If any request fails, every response is still read
+        before the first error is raised.
+
+        :param iterable requests: The (crypt_method, key, crypt_type, text)
+               of each request, optionally followed by the offset and policy.
+        :return list: The encrypted/decrypted text of each request, in order.
+        """
+        requests = list(requests)
+        error = []
+
+        def send():
+            try:
+                for crypt_method, key, crypt_type, text, *options in requests:
+                    if isinstance(text, str):
+                        text = text.encode()
+                    self.socket.sendall(request(crypt_method, key, crypt_type,
+                                                text, *options))
+            except (OSError, ValueError) as e:
+                error.append(e)
+                self.socket.shutdown(socket.SHUT_RDWR)
+
+        sender = threading.Thread(target=send, daemon=True)
+        sender.start()
+        results = []
+        try:
+            for crypt_method, key, crypt_type, text, *_ in requests:
+                try:
+                    data = self.read_response()
+                except ValueError as e:
+                    error.append(e)
+                    data = b""
+                results.append(data.decode() if isinstance(text, str)
+                               else data)
+        except ConnectionError:
+            if error:
+                raise error[0]
+            raise
+        finally:
+            sender.join()
+        if error:
+            raise error[0]
+        return results
+
+    def encrypt(self, text, crypt_method, key, offset=0):
+        """
+        Encrypts a string or bytes on the server.
+
+        :param string | bytes text: The text to encrypt.
+        :param string crypt_method: The method of cryptography ('C', 'M', 'P').
+        :param string | integer key: The key for the method.
+        :param integer offset: The position of the text in the whole data.
+        :return string | bytes: The encrypted text.
+        """
+        return self.transform(crypt_method.upper(), key, "encrypt", text,
+                              offset)
+
+    def decrypt(self, text, crypt_method, key, offset=0):
+        """
+        Decrypts a string or bytes on the server.
+
+        :param string | bytes text: The text to decrypt.
+        :param string crypt_method: The method of cryptography ('C', 'M', 'P').
+        :param string | integer key: The key for the method.
+        :param integer offset: The position of the text in the whole data.
+        :return string | bytes: The decrypted text.
+        """
+        return self.transform(crypt_method.upper(), key, "decrypt", text,
+                              offset)
+
+
+def main():
+    """ Encrypts/decrypts stdin or a file through a running server. """
+    parser = argparse.ArgumentParser(
+        prog="text_cryptography.client",
+        description="Encrypt or decrypt through a running "
+                    "text_cryptography.server")
+    parser.add_argument("file", nargs='?', default='-',
+                        help="the file to encrypt/decrypt (default: stdin)")
+    parser.add_argument("-m", "--method", required=True, type=str.upper,
+                        choices=list(METHOD_NAMES),
+                        help="C (caesar), M (monoalphabetic) or "
+                             "P (polyalphabetic)")
+    parser.add_argument("-t", "--type", required=True, type=str.upper,
+                        choices=['E', 'D'], help="E (encrypt) or D (decrypt)")
+    parser.add_argument("-k", "--key", required=True, help="the key")
+    parser.add_argument("-s", "--socket", default=SOCKET,
+                        help=f"the server socket (default: {SOCKET})")
+    args = parser.parse_args()
+
+    try:
+        key = parse_key(args.method, args.key)
+    except ValueError as e:
+        parser.error(str(e))
+    crypt_type = "encrypt" if args.type == 'E' else "decrypt"
+
+    try:
+        if args.file == '-':
+            data = sys.stdin.buffer.read()
+        else:
+            with open(args.file, 'rb') as f:
+                data = f.read()
+        with Client(args.socket) as client:
+            data = client.transform(args.method, key, crypt_type, data)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        raise SystemExit(1)
+    sys.stdout.buffer.write(data)
+
+
+if __name__ == "__main__":
+    main()
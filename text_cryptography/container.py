@@ -0,0 +1,325 @@
+import os
+import sys
+import json
+import zlib
+import struct
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from text_cryptography.cipher import (BACKENDS, CHAIN, CRYPT_TYPES, INVERSE,
+                                      METHOD_NAMES, get_cipher, parse_chain,
+                                      parse_key)
+from text_cryptography.__main__ import CHUNK_SIZE, positive_integer
+
+MAGIC = b"TXTCRYPT"
+VERSION = 1
+# The length of the JSON header, after the magic bytes
+HEADER = struct.Struct(">I")
+# The offset and length of the JSON chunk index, then the magic bytes again
+FOOTER = struct.Struct(">QI8s")
+
+
+class ContainerError(ValueError):
+
+    def __init__(self, message, file=None, chunks=None):
+        """
+        Raised when a container is not valid, is corrupted or is opened with
+        the wrong key.
+
+        :param string message: What is wrong.
+        :param string file: The container.
+        :param list chunks: The numbers of any corrupted chunks.
+        """
+        self.file = file
+        self.chunks = chunks or []
+        source = f"{file}: " if file else ""
+        super().__init__(f"{source}{message}")
+
+
+def pack(file, new_file, crypt_method, key, crypt_type="encrypt",
+         chunk_size=CHUNK_SIZE, backend="python"):
+    """
+    Encrypts or decrypts a file into a container. The container starts with
+    a header of the method, type, key fingerprint and chunk size, followed by
+    the transformed chunks and an index of each chunk's offset, length and
+    CRC-32, so that chunks can be checked and transformed on their own.
+
+    Every byte is transformed at its position in the file and bytes that are
+    not in CHARS are kept unchanged, so unpacking gives back the exact file.
+
+    :param string file: The file to pack.
+    :param string new_file: The container to write.
+    :param string crypt_method: The method of cryptography.
+    :param string | integer | tuple key: The key for the method.
+    :param string crypt_type: Either 'encrypt' or 'decrypt'.
+    :param integer chunk_size: The number of bytes in each chunk.
+    :param string backend: Either 'python' or 'numpy'.
+    :return dict: The header of the container.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size was: {chunk_size}")
+    cipher = get_cipher(crypt_method, key, crypt_type, backend)
+    header = {"version": VERSION,
+              "method": crypt_method,
+              "crypt_type": crypt_type,
+              "fingerprint": cipher.fingerprint,
+              "chunk_size": chunk_size,
+              "size": os.path.getsize(file)}
+    header_data = json.dumps(header).encode()
+
+    chunks = []
+    with open(file, 'rb') as in_file, open(new_file, 'wb') as out_file:
+        out_file.write(MAGIC + HEADER.pack(len(header_data)) + header_data)
+        position = 0
+        for chunk in iter(lambda: in_file.read(chunk_size), b""):
+            data = cipher.transform(chunk, position)
+            chunks.append([out_file.tell(), len(data), zlib.crc32(data)])
+            out_file.write(data)
+            position += len(chunk)
+
+        index_data = json.dumps(chunks).encode()
+        index_offset = out_file.tell()
+        out_file.write(index_data)
+        out_file.write(FOOTER.pack(index_offset, len(index_data), MAGIC))
+    return header
+
+
+def read_index(file):
+    """
+    Reads the header and chunk index of a container without reading any of
+    its chunks, checking that the chunks add up to the size of the packed
+    file.
+
+    :param string file: The container.
+    :return tuple: The header and the [offset, length, CRC-32] of each chunk.
+    """
+    with open(file, 'rb') as f:
+        if (f.read(len(MAGIC)) != MAGIC or os.path.getsize(file) <
+                len(MAGIC) + HEADER.size + FOOTER.size):
+            raise ContainerError("not a container", file)
+        try:
+            length, = HEADER.unpack(f.read(HEADER.size))
+            header = json.loads(f.read(length).decode())
+            if header.get("version") != VERSION:
+                raise ContainerError(f"unsupported version "
+                                     f"{header.get('version')}", file)
+
+            f.seek(-FOOTER.size, os.SEEK_END)
+            index_offset, index_length, magic = FOOTER.unpack(
+                f.read(FOOTER.size))
+            if magic != MAGIC:
+                raise ContainerError("the chunk index is missing", file)
+            f.seek(index_offset)
+            chunks = json.loads(f.read(index_length).decode())
+            size = sum(length for _, length, _ in chunks)
+            if size != header["size"]:
+                raise ContainerError(f"the chunk index covers {size} of "
+                                     f"{header['size']} bytes", file)
+        except ContainerError:
+            raise
+        except (struct.error, KeyError, TypeError, ValueError) as e:
+            raise ContainerError(f"the header or index is corrupted ({e})",
+                                 file)
+    return header, chunks
+
+
+def read_chunk(file, chunk):
+    """
+    Reads a chunk of a container and checks it against its CRC-32.
+
+    :param file file: The open container.
+    :param list chunk: The offset, length and CRC-32 of the chunk.
+    :return bytes: The chunk, or None if it is corrupted.
+    """
+    offset, length, checksum = chunk
+    file.seek(offset)
+    data = file.read(length)
+    if len(data) != length or zlib.crc32(data) != checksum:
+        return None
+    return data
+
+
+def verify(file):
+    """
+    Checks every chunk of a container against its CRC-32, without needing
+    the key or transforming anything.
+
+    :param string file: The container.
+    :return list: The numbers of the corrupted chunks, counted from 0.
+    """
+    _, chunks = read_index(file)
+    with open(file, 'rb') as f:
+        return [number for number, chunk in enumerate(chunks)
+                if read_chunk(f, chunk) is None]
+
+
+def unpack_chunk(file, chunk, position, crypt_method, key, crypt_type,
+                 backend="python"):
+    """
+    Checks a chunk of a container and undoes its transform. This is a module
+    level function so that it can be sent to worker processes.
+
+    :param string file: The container.
+    :param list chunk: The offset, length and CRC-32 of the chunk.
+    :param integer position: The position of the chunk in the packed file.
+    :param string crypt_method: The method the container was packed with.
+    :param string | integer | tuple key: The key for the method.
+    :param string crypt_type: The type the container was packed with.
+    :param string backend: Either 'python' or 'numpy'.
+    :return bytes: The original data of the chunk, or None if it is
+            corrupted.
+    """
+    with open(file, 'rb') as f:
+        data = read_chunk(f, chunk)
+    if data is None:
+        return None
+    cipher = get_cipher(crypt_method, key, INVERSE[crypt_type], backend)
+    return cipher.transform(data, position)
+
+
+def unpack(file, new_file, key, workers=1, backend="python"):
+    """
+    Restores the file packed into a container. The key is checked against
+    the fingerprint in the header before anything is transformed, and every
+    chunk is checked against its CRC-32 before it is transformed. With more
+    than one worker the chunks are spread over a process pool, with at most
+    two chunks per worker in flight at once.
+
+    :param string file: The container.
+    :param string new_file: The file to write.
+    :param string | integer | tuple key: The key the container was packed
+           with.
+    :param integer workers: The number of processes.
+    :param string backend: Either 'python' or 'numpy'.
+    :return dict: The header of the container.
+    """
+    header, chunks = read_index(file)
+    crypt_method, crypt_type = header["method"], header["crypt_type"]
+    try:
+        cipher = get_cipher(crypt_method, key, crypt_type, backend)
+    except (TypeError, ValueError) as e:
+        raise ContainerError(f"the key does not fit the container ({e})",
+                             file)
+    if cipher.fingerprint != header["fingerprint"]:
+        raise ContainerError("the key does not match the container", file)
+
+    positions = []
+    position = 0
+    for _, length, _ in chunks:
+        positions.append(position)
+        position += length
+    args = (crypt_method, key, crypt_type, backend)
+
+    def results():
+        if workers <= 1:
+            for chunk, position in zip(chunks, positions):
+                yield unpack_chunk(file, chunk, position, *args)
+            return
+        with ProcessPoolExecutor(workers) as executor:
+            pending = deque()
+            for chunk, position in zip(chunks, positions):
+                pending.append(executor.submit(unpack_chunk, file, chunk,
+                                               position, *args))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    corrupted = []
+    with open(new_file, 'wb') as f:
+        for number, data in enumerate(results()):
+            if data is None:
+                corrupted.append(number)
+            elif not corrupted:
+                f.write(data)
+    if corrupted:
+        os.remove(new_file)
+        raise ContainerError(f"{len(corrupted)} corrupted chunks, the first "
+                             f"is {corrupted[0]}", file, corrupted)
+    return header
+
+
+def main():
+    """ Packs, unpacks or checks a chunk-indexed container. """
+    parser = argparse.ArgumentParser(
+        prog="text_cryptography.container",
+        description="Encrypt files into containers with a header and a "
+                    "checksummed chunk index")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    packer = commands.add_parser("pack", help="encrypt a file into a "
+                                              "container")
+    packer.add_argument("file", help="the file to pack")
+    packer.add_argument("container", help="the container to write")
+    packer.add_argument("-m", "--method", type=str.upper,
+                        choices=list(METHOD_NAMES),
+                        help="C (caesar), M (monoalphabetic) or "
+                             "P (polyalphabetic)")
+    packer.add_argument("-t", "--type", type=str.upper, default='E',
+                        choices=list(CRYPT_TYPES),
+                        help="E (encrypt) or D (decrypt) (default: E)")
+    packer.add_argument("-s", "--chunk-size", type=positive_integer,
+                        default=CHUNK_SIZE,
+                        help=f"bytes in each chunk (default: {CHUNK_SIZE})")
+
+    unpacker = commands.add_parser("unpack", help="restore the file from a "
+                                                  "container")
+    unpacker.add_argument("container", help="the container to read")
+    unpacker.add_argument("file", help="the file to write")
+    unpacker.add_argument("-w", "--workers", type=positive_integer,
+                          default=1,
+                          help="the number of processes (default: 1)")
+
+    for command in (packer, unpacker):
+        keys = command.add_mutually_exclusive_group(required=True)
+        keys.add_argument("-k", "--key", help="the key")
+        keys.add_argument("-c", "--chain", nargs=3, action="append",
+                          metavar=("METHOD", "TYPE", "KEY"),
+                          help="a stage of a chain of ciphers, repeated for "
+                               "each stage")
+        command.add_argument("-b", "--backend", choices=BACKENDS,
+                             default="python")
+
+    verifier = commands.add_parser("verify", help="check every chunk of a "
+                                                  "container")
+    verifier.add_argument("container", help="the container to check")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "verify":
+            header, chunks = read_index(args.container)
+            corrupted = verify(args.container)
+            method = METHOD_NAMES.get(header["method"], "Chain")
+            print(f"{args.container}: {method} {header['crypt_type']}ed, "
+                  f"{header['size']} bytes in "
+                  f"{len(chunks)} chunks, {len(corrupted)} corrupted"
+                  + (f": {', '.join(map(str, corrupted))}"
+                     if corrupted else ""))
+            raise SystemExit(1 if corrupted else 0)
+
+        if args.command == "pack" and not args.chain and not args.method:
+            parser.error("pack needs --method with --key")
+        method = CHAIN if args.chain else (
+            args.method if args.command == "pack"
+            else read_index(args.container)[0]["method"])
+        if method == CHAIN and not args.chain:
+            parser.error("this container needs --chain")
+        try:
+            key = parse_chain(args.chain) if args.chain else \
+                parse_key(method, args.key)
+        except ValueError as e:
+            parser.error(str(e))
+
+        if args.command == "pack":
+            pack(args.file, args.container, method, key,
+                 CRYPT_TYPES[args.type], args.chunk_size, args.backend)
+        else:
+            unpack(args.container, args.file, key, args.workers,
+                   args.backend)
+    except (ContainerError, OSError) as e:
+        print(e, file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import math
+import argparse
+from collections import Counter
+from text_cryptography.cipher import CHARS, METHOD_NAMES, Cipher
+from text_cryptography.__main__ import Cryptography
+
+MAX_KEY_LENGTH = 32
+# How close to the best index of coincidence a key length must be to be
+# chosen, so that the shortest period wins over its multiples
+KEY_LENGTH_TOLERANCE = 0.9
+
+# Relative frequencies of English letters, in percent
+LETTER_FREQUENCIES = {
+    'a': 8.2, 'b': 1.5, 'c': 2.8, 'd': 4.3, 'e': 12.7, 'f': 2.2, 'g': 2.0,
+    'h': 6.1, 'i': 7.0, 'j': 0.15, 'k': 0.77, 'l': 4.0, 'm': 2.4, 'n': 6.7,
+    'o': 7.5, 'p': 1.9, 'q': 0.095, 'r': 6.0, 's': 6.3, 't': 9.1, 'u': 2.8,
+    'v': 0.98, 'w': 2.4, 'x': 0.15, 'y': 2.0, 'z': 0.074}
+# Share of English text made up of each kind of character
+SHARES = {"lower": 0.76, "upper": 0.03, "space": 0.16, "newline": 0.01,
+          "digit": 0.01, "punctuation": 0.03}
+PUNCTUATION_WEIGHTS = {',': 6, '.': 6, "'": 2, '"': 2, '-': 2, '(': 1,
+                       ')': 1, ':': 1, ';': 1, '?': 1, '!': 1}
+
+
+def reference_distribution():
+    """
+    Builds the expected frequency of each character of CHARS in English text.
+    Every character gets a small share so that no shift scores infinitely
+    badly.
+
+    :return list: The log probability of each character, by index in CHARS.
+    """
+    weights = dict.fromkeys(CHARS, 0.001)
+    for letter, frequency in LETTER_FREQUENCIES.items():
+        weights[letter] += SHARES["lower"] * frequency / 100
+        weights[letter.upper()] += SHARES["upper"] * frequency / 100
+    weights[' '] += SHARES["space"]
+    weights['\n'] += SHARES["newline"]
+    for digit in "0123456789":
+        weights[digit] += SHARES["digit"] / 10
+    total_weight = sum(PUNCTUATION_WEIGHTS.values())
+    for mark, weight in PUNCTUATION_WEIGHTS.items():
+        weights[mark] += SHARES["punctuation"] * weight / total_weight
+
+    total = sum(weights.values())
+    return [math.log(weights[char] / total) for char in CHARS]
+
+
+REFERENCE = reference_distribution()
+
+
+def histogram(text):
+    """
+    Counts each character of CHARS in the text. Other characters are ignored.
+
+    :param string text: The text to count.
+    :return list: The count of each character, by index in CHARS.
+    """
+    counts = Counter(text)
+    return [counts[char] for char in CHARS]
+
+
+def score_shifts(counts, reference=REFERENCE):
+    """
+    Scores every caesar shift from the histogram of the ciphertext, without
+    transforming the text, by how likely the decrypted histogram is under
+    the reference distribution.
+
+    :param list counts: The histogram of the ciphertext.
+    :param list reference: The log probability of each character.
+    :return list: The score of each shift, higher is more likely.
+    """
+    size = len(CHARS)
+    present = [(index, count) for index, count in enumerate(counts) if count]
+    return [sum(count * reference[(index - shift) % size]
+                for index, count in present)
+            for shift in range(size)]
+
+
+def best_shift(counts, reference=REFERENCE):
+    """
+    Finds the most likely caesar shift from the histogram of the ciphertext.
+
+    :param list counts: The histogram of the ciphertext.
+    :param list reference: The log probability of each character.
+    :return integer: The shift.
+    """
+    scores = score_shifts(counts, reference)
+    return max(range(len(scores)), key=scores.__getitem__)
+
+
+def index_of_coincidence(counts):
+    """
+    Gets the chance that two characters picked from the text are the same.
+
+    :param list counts: The histogram of the text.
+    :return float: The index of coincidence.
+    """
+    total = sum(counts)
+    if total < 2:
+        return 0.0
+    return sum(count * (count - 1) for count in counts) / (total * (total - 1))
+
+
+def key_length(text, max_key_length=MAX_KEY_LENGTH):
+    """
+    Estimates the length of a polyalphabetic key from the average index of
+    coincidence of the text split into that many columns. The shortest
+    length close to the best one is chosen, as multiples of the key length
+    score just as well.
+
+    :param string text: The ciphertext.
+    :param integer max_key_length: The longest key length to try.
+    :return integer: The key length.
+    """
+    max_key_length = max(1, min(max_key_length, len(text) // 2))
+    coincidences = {}
+    for length in range(1, max_key_length + 1):
+        columns = [histogram(text[column::length]) for column in range(length)]
+        coincidences[length] = sum(map(index_of_coincidence,
+                                       columns)) / length
+    best = max(coincidences.values())
+    return next(length for length, coincidence in coincidences.items()
+                if coincidence >= best * KEY_LENGTH_TOLERANCE)
+
+
+def crack_caesar(text, reference=REFERENCE):
+    """
+    Recovers the key of text encrypted with a caesar cipher.
+
+    :param string text: The ciphertext.
+    :param list reference: The log probability of each character.
+    :return integer: The key.
+    """
+    return best_shift(histogram(text), reference)
+
+
+def crack_polyalphabetic(text, max_key_length=MAX_KEY_LENGTH,
+                         reference=REFERENCE):
+    """
+    Recovers a key of text encrypted with a polyalphabetic cipher, by
+    estimating the key length and solving each column of the key as a
+    caesar cipher.
+
+    :param string text: The ciphertext.
+    :param integer max_key_length: The longest key length to try.
+    :param list reference: The log probability of each character.
+    :return string: The key.
+    """
+    length = key_length(text, max_key_length)
+    return "".join(CHARS[best_shift(histogram(text[column::length]),
+                                    reference)]
+                   for column in range(length))
+
+
+def main():
+    """ Recovers the key of an encrypted file. """
+    parser = argparse.ArgumentParser(
+        prog="text_cryptography.crack",
+        description="Recover the key of a file encrypted with a caesar or "
+                    "polyalphabetic cipher")
+    parser.add_argument("file", help="the encrypted file")
+    parser.add_argument("-m", "--method", required=True, type=str.upper,
+                        choices=['C', 'P'],
+                        help="C (caesar) or P (polyalphabetic)")
+    parser.add_argument("-l", "--max-key-length", type=int,
+                        default=MAX_KEY_LENGTH,
+                        help="the longest polyalphabetic key to try "
+                             f"(default: {MAX_KEY_LENGTH})")
+    parser.add_argument("-p", "--preview", type=int, default=200,
+                        help="the number of decrypted characters to show "
+                             "(default: 200)")
+    args = parser.parse_args()
+
+    text = Cryptography.read(args.file)
+    if args.method == 'C':
+        key = crack_caesar(text)
+    else:
+        key = crack_polyalphabetic(text, args.max_key_length)
+
+    print(f"{METHOD_NAMES[args.method]} key: {key!r}")
+    if args.preview:
+        cipher = Cipher(args.method, key, "decrypt")
+        print(cipher.transform(text[:args.preview]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,12 @@
 import logging
 
+# The number of items of data shown in a log message
+PREVIEW_LENGTH = 100
+
 # Create a logger called 'Debugger'
 debug_logger = logging.getLogger('Debugger')
 debug_logger.setLevel(logging.DEBUG)
 
-# Create a file handler which logs even debug messages
-file_handler = logging.FileHandler('debug.log')
-file_handler.setLevel(logging.DEBUG)
-
 # Create console handler with a higher log level
 console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.ERROR)
@@ -17,9 +16,49 @@ formatter_format = "%(asctime)s - %(name)s - %(levelname)s - " + \
     "%(funcName)s - Line: %(lineno)s - %(message)s"
 formatter = logging.Formatter(formatter_format)
 
-file_handler.setFormatter(formatter)
 console_handler.setFormatter(formatter)
 
-# Add the handlers to the logger
-debug_logger.addHandler(file_handler)
+# Add the handler to the logger
 debug_logger.addHandler(console_handler)
+
+
+def enable_debug(file='debug.log'):
+    """
+    Creates a file handler which logs even debug messages. This is only done
+    when debugging so that importing the logger writes no files.
+
+    :param string file: The file to log to.
+    :return None:
+    """
+    if any(isinstance(handler, logging.FileHandler)
+           for handler in debug_logger.handlers):
+        return
+    file_handler = logging.FileHandler(file)
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(formatter)
+    debug_logger.addHandler(file_handler)
+    debug_logger.disabled = False
+
+
+class Preview:
+
+    def __init__(self, data, length=PREVIEW_LENGTH):
+        """
+        Holds data to log so that it is only formatted, and truncated, when
+        the message is actually emitted.
+
+        :param string | list data: The data to preview.
+        :param integer length: The number of items to show.
+        """
+        self.data = data
+        self.length = length
+
+    def __str__(self):
+        """
+        Formats the start of the data and its total length.
+
+        :return string: The preview.
+        """
+        if len(self.data) <= self.length:
+            return repr(self.data)
+        return f"{self.data[:self.length]!r}... ({len(self.data)} total)"
@@ -0,0 +1,129 @@
+import os
+import time
+import asyncio
+from text_cryptography.__main__ import CHUNK_SIZE, positive_integer
+from text_cryptography.batch import (argument_parser, crypt_chunk,
+                                     output_file, parse_args, summary,
+                                     total_summary)
+
+QUEUE_SIZE = 4
+CONCURRENCY = 8
+
+
+async def crypt_file(file, new_file, cipher, chunk_size=CHUNK_SIZE,
+                     queue_size=QUEUE_SIZE):
+    """
+    Encrypts or decrypts a file with reading, transforming and writing run as
+    separate stages joined by bounded queues, so that disk I/O overlaps with
+    the transform. The blocking calls of each stage run in threads.
+
+    :param string file: The file to encrypt/decrypt.
+    :param string new_file: The file to write to.
+    :param Cipher cipher: The compiled cipher.
+    :param integer chunk_size: The number of characters in each chunk.
+    :param integer queue_size: The number of chunks each queue holds.
+    :return tuple: The file, new file, characters read, invalid characters
+            and the seconds taken.
+    """
+    loop = asyncio.get_running_loop()
+    read_queue = asyncio.Queue(queue_size)
+    write_queue = asyncio.Queue(queue_size)
+    start = time.perf_counter()
+
+    async def read():
+        with open(file, 'r') as f:
+            while True:
+                chunk = await loop.run_in_executor(None, f.read, chunk_size)
+                if not chunk:
+                    break
+                await read_queue.put(chunk)
+        await read_queue.put(None)
+
+    async def crypt():
+        offset = position = invalid_count = 0
+        while True:
+            chunk = await read_queue.get()
+            if chunk is None:
+                break
+            data, invalid = await loop.run_in_executor(
+                None, crypt_chunk, cipher, chunk, position)
+            await write_queue.put(data)
+            offset += len(chunk)
+            position += len(data)
+            invalid_count += invalid
+        await write_queue.put(None)
+        return offset, invalid_count
+
+    async def write():
+        with open(new_file, 'w') as f:
+            while True:
+                data = await write_queue.get()
+                if data is None:
+                    break
+                await loop.run_in_executor(None, f.write, data)
+
+    tasks = [asyncio.ensure_future(stage()) for stage in (read, crypt, write)]
+    try:
+        _, (chars, invalid), _ = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return file, new_file, chars, invalid, time.perf_counter() - start
+
+
+async def crypt_files(files, cipher, output_dir=None,
+                      concurrency=CONCURRENCY, chunk_size=CHUNK_SIZE,
+                      queue_size=QUEUE_SIZE):
+    """
+    Encrypts or decrypts many files at once, with at most concurrency files
+    in the pipeline at a time.
+
+    :param list files: The files to encrypt/decrypt.
+    :param Cipher cipher: The compiled cipher.
+    :param string output_dir: An optional directory for the new files.
+    :param integer concurrency: The number of files processed at once.
+    :param integer chunk_size: The number of characters in each chunk.
+    :param integer queue_size: The number of chunks each queue holds.
+    :return list: The result of each file, in order.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency was: {concurrency}")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def crypt(file):
+        new_file = output_file(file, cipher, output_dir)
+        async with semaphore:
+            return await crypt_file(file, new_file, cipher, chunk_size,
+                                    queue_size)
+
+    return await asyncio.gather(*(crypt(file) for file in files))
+
+
+def main():
+    """ Encrypts/decrypts a batch of files through the asyncio pipeline. """
+    parser = argument_parser(
+        "text_cryptography.pipeline",
+        "Encrypt or decrypt every file in a directory or glob with "
+        "overlapped reads, transforms and writes")
+    parser.add_argument("-c", "--concurrency", type=positive_integer,
+                        default=CONCURRENCY,
+                        help="the number of files processed at once "
+                             f"(default: {CONCURRENCY})")
+    args, cipher, files = parse_args(parser)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    results = asyncio.run(crypt_files(files, cipher, args.output_dir,
+                                      args.concurrency))
+    seconds = time.perf_counter() - start
+
+    for result in results:
+        print(summary(result))
+    print(total_summary(len(files), sum(result[2] for result in results),
+                        seconds))
+
+
+if __name__ == "__main__":
+    main()
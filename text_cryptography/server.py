@@ -0,0 +1,164 @@
+import os
+import sys
+import json
+import stat
+import errno
+import socket
+import signal
+import asyncio
+import argparse
+from text_cryptography.cipher import (CACHE_SIZE, Cipher,
+                                      InvalidCharacterError, cipher_cache,
+                                      get_cipher)
+from text_cryptography.client import FRAME_HEADER, MAX_FRAME, SOCKET, frame
+from text_cryptography.__main__ import POLICIES
+from text_cryptography.log import debug_logger as logger
+
+
+async def read_frame(reader):
+    """
+    Reads a frame from a client.
+
+    :param StreamReader reader: The connection to read from.
+    :return bytes: The payload of the frame.
+    """
+    header = await reader.readexactly(FRAME_HEADER.size)
+    size = FRAME_HEADER.unpack(header)[0]
+    if size > MAX_FRAME:
+        raise ValueError(f"Frames are limited to {MAX_FRAME} bytes, the "
+                         f"frame was {size}")
+    return await reader.readexactly(size)
+
+
+def respond(header, data):
+    """
+    Encrypts or decrypts the data of a request with the cached cipher,
+    applying the invalid character policy.
+
+    :param bytes header: The JSON header of the request.
+    :param bytes data: The data to encrypt/decrypt.
+    :return tuple: The response header and the encrypted/decrypted data.
+    """
+    try:
+        header = json.loads(header.decode())
+        if not isinstance(header, dict):
+            raise ValueError(f"The header must be a JSON object, not "
+                             f"{type(header).__name__}")
+        policy = header.get("policy", "pass")
+        if policy not in POLICIES:
+            raise ValueError(f"policy was: {policy}")
+        cipher = get_cipher(header["method"], header["key"], header["type"])
+
+        invalid = Cipher.invalid_characters(data)
+        if invalid and policy == "strict":
+            raise InvalidCharacterError(Cipher.find_invalid(data))
+        # Skipped bytes are left out before the transform, so that they use
+        # up no key positions
+        if invalid and policy == "skip":
+            data = data.translate(None, bytes(invalid))
+        data = cipher.transform(data, header.get("offset", 0))
+    except (KeyError, TypeError, ValueError) as e:
+        logger.error("request failed: %s", e)
+        return {"error": str(e) or type(e).__name__}, b""
+    return {"error": None}, data
+
+
+async def handle(reader, writer):
+    """
+    Answers the requests of a connection in the order they arrive until the
+    client disconnects.
+
+    :param StreamReader reader: The connection to read from.
+    :param StreamWriter writer: The connection to write to.
+    :return None:
+    """
+    try:
+        while True:
+            try:
+                header = await read_frame(reader)
+                data = await read_frame(reader)
+            except asyncio.IncompleteReadError:
+                break
+            response, data = respond(header, data)
+            writer.write(frame(json.dumps(response).encode()) + frame(data))
+            await writer.drain()
+    except (ConnectionError, ValueError) as e:
+        logger.error("connection closed: %s", e)
+    finally:
+        writer.close()
+
+
+def remove_stale(path):
+    """
+    Removes a socket left by a server that did not shut down cleanly. A
+    socket that still accepts connections belongs to a running server and is
+    left alone.
+
+    :param string path: The socket.
+    :return None:
+    """
+    if not (os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode)):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except ConnectionRefusedError:
+            os.remove(path)
+            return
+    raise OSError(errno.EADDRINUSE, "A server is already running", path)
+
+
+async def serve(path=SOCKET, ready=None):
+    """
+    Listens on a Unix socket until cancelled. A stale socket left by a
+    server that did not shut down cleanly is replaced, but the socket of a
+    running server is not.
+
+    :param string path: The socket to listen on.
+    :param Event ready: An optional threading.Event set once listening.
+    :return None:
+    """
+    remove_stale(path)
+    server = await asyncio.start_unix_server(handle, path)
+    inode = os.stat(path).st_ino
+    if ready is not None:
+        ready.set()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        # Only remove the socket if another server has not replaced it
+        if os.path.exists(path) and os.stat(path).st_ino == inode:
+            os.remove(path)
+
+
+def main():
+    """ Runs the server until it is interrupted. """
+    parser = argparse.ArgumentParser(
+        prog="text_cryptography.server",
+        description="Keep compiled ciphers warm and encrypt/decrypt requests "
+                    "from text_cryptography.client over a Unix socket")
+    parser.add_argument("-s", "--socket", default=SOCKET,
+                        help=f"the socket to listen on (default: {SOCKET})")
+    parser.add_argument("-c", "--cache-size", type=int, default=CACHE_SIZE,
+                        help="the number of compiled keys to keep "
+                             f"(default: {CACHE_SIZE})")
+    args = parser.parse_args()
+    if not hasattr(asyncio, "start_unix_server"):
+        parser.error("Unix sockets are not supported on this platform")
+
+    cipher_cache.maxsize = args.cache_size
+    # Stop on a termination signal like on Ctrl-C, removing the socket
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print(f"Listening on {args.socket}", file=sys.stderr)
+    try:
+        asyncio.run(serve(args.socket))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(e, file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import json
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# The stages of a run, in the order they are reported
+STAGES = ("read", "index", "compile", "scan", "transform", "write")
+
+
+class Stage:
+
+    def __init__(self):
+        """
+        The totals recorded for one stage of a run.
+        """
+        self.calls = 0
+        self.seconds = 0.0
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def as_dict(self):
+        """
+        Gets the totals of the stage, with its throughput.
+
+        :return dict: The totals.
+        """
+        return {"calls": self.calls,
+                "seconds": self.seconds,
+                "size": self.size,
+                "mb_per_second": (self.size / self.seconds / 1024 ** 2
+                                  if self.seconds else 0.0),
+                "hits": self.hits,
+                "misses": self.misses}
+
+
+class Stats:
+
+    def __init__(self):
+        """
+        Records the wall time, amount of data and cache hits of each stage of
+        encrypting/decrypting, so that the slowest stage can be found without
+        a profiler.
+        """
+        self.stages = OrderedDict((name, Stage()) for name in STAGES)
+
+    def add(self, name, seconds, size=0, hit=None):
+        """
+        Records a call of a stage.
+
+        :param string name: The name of the stage.
+        :param float seconds: The wall time of the call.
+        :param integer size: The number of characters or bytes processed.
+        :param bool hit: Whether the call was answered from a cache, or None
+               if the stage has no cache.
+        :return None:
+        """
+        stage = self.stages.setdefault(name, Stage())
+        stage.calls += 1
+        stage.seconds += seconds
+        stage.size += size
+        if hit is not None:
+            stage.hits += hit
+            stage.misses += not hit
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Times the block as a call of a stage. The block can set the 'size'
+        and 'hit' items of the dict it is given.
+
+        :param string name: The name of the stage.
+        :return generator: A dict for the size and hit of the call.
+        """
+        call = {"size": 0, "hit": None}
+        start = time.perf_counter()
+        try:
+            yield call
+        finally:
+            self.add(name, time.perf_counter() - start, call["size"],
+                     call["hit"])
+
+    @property
+    def seconds(self):
+        """
+        Gets the total wall time of every stage.
+
+        :return float: The total seconds.
+        """
+        return sum(stage.seconds for stage in self.stages.values())
+
+    def reset(self):
+        """
+        Clears every stage.
+
+        :return None:
+        """
+        self.stages = OrderedDict((name, Stage()) for name in STAGES)
+
+    def as_dict(self):
+        """
+        Gets the totals of every stage that was used.
+
+        :return dict: The totals of each stage, by name.
+        """
+        return {"seconds": self.seconds,
+                "stages": {name: stage.as_dict()
+                           for name, stage in self.stages.items()
+                           if stage.calls}}
+
+    def dump(self, file):
+        """
+        Writes the totals of every stage to a JSON file.
+
+        :param string file: The file to write to.
+        :return None:
+        """
+        with open(file, 'w') as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def report(self):
+        """
+        Formats a table of the time, share of the total, data and cache hits
+        of every stage that was used.
+
+        :return string: The table.
+        """
+        total = self.seconds or 1.0
+        lines = [f"{'stage':<11}{'calls':>7}{'seconds':>11}{'%':>7}"
+                 f"{'MB':>10}{'MB/s':>10}{'hits':>7}{'misses':>8}"]
+        for name, stage in self.stages.items():
+            if not stage.calls:
+                continue
+            totals = stage.as_dict()
+            lines.append(f"{name:<11}{stage.calls:>7}{stage.seconds:>11.4f}"
+                         f"{stage.seconds / total * 100:>7.1f}"
+                         f"{stage.size / 1024 ** 2:>10.2f}"
+                         f"{totals['mb_per_second']:>10.2f}"
+                         f"{stage.hits:>7}{stage.misses:>8}")
+        lines.append(f"{'total':<11}{'':>7}{self.seconds:>11.4f}")
+        return "\n".join(lines)
@@ -1,10 +1,29 @@
 import unittest
 import os
+import io
+import json
 import logging
+import socket
+import asyncio
+import tempfile
+import threading
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from contextlib import redirect_stderr, redirect_stdout
 
 from text_cryptography.__main__ import Cryptography as crypt
 from text_cryptography.__main__ import Check as chk
-from text_cryptography.__main__ import DEBUG
+from text_cryptography.__main__ import DEBUG, KEY_ENV, main
+from text_cryptography.cipher import Cipher, CipherCache, CHARS, numpy
+from text_cryptography.cipher import CHAIN, Chain, parse_chain
+from text_cryptography import encrypt, decrypt, InvalidCharacterError
+from text_cryptography import encrypt_many, decrypt_many
+from text_cryptography import batch, benchmark, container, crack, pipeline
+from text_cryptography import server
+from text_cryptography.client import Client, frame
+from text_cryptography.log import Preview
+from text_cryptography.stats import Stats
 from text_cryptography.tests.log import test_logger as logger
 
 if DEBUG:
@@ -116,6 +135,246 @@ class CryptographyTest(unittest.TestCase):
         self.test_6.key = "fail_2"
         self.assertNotEqual(self.test_6.monoalphabetic(), fail_text)
 
+    def test_crypt_file(self):
+        logger.info("Testing 'crypt_file' method...")
+        self.test_6.key = "long_keyword"
+        for chunk_size in (1, 5, 7, 1024):
+            self.test_6.crypt_file("crypt_file.txt", chunk_size)
+            self.assertEqual(crypt.read("crypt_file.txt"),
+                             self.test_6.polyalphabetic())
+
+    def test_crypt_file_binary(self):
+        logger.info("Testing 'crypt_file' method with bytes...")
+        self.test_6.key = "long_keyword"
+        self.test_6.crypt_file("crypt_file.txt", 7, binary=True)
+        self.assertEqual(crypt.read("crypt_file.txt"),
+                         self.test_6.polyalphabetic())
+
+        with open("binary_test.txt", 'wb') as f:
+            f.write(b"ab\r\ncd")
+        test = crypt("binary_test.txt", "encrypt", 'C', 1)
+        test.crypt_file("crypt_file.txt", binary=True)
+        with open("crypt_file.txt", 'rb') as f:
+            self.assertEqual(f.read(), b"bcade")
+        os.remove("binary_test.txt")
+
+    def test_chain(self):
+        logger.info("Testing 'chain' method...")
+        stages = (('M', "test", "encrypt"), ('P', "test", "encrypt"))
+        test = crypt("test5.txt", "encrypt", CHAIN, stages)
+        self.assertEqual(test.chain(),
+                         encrypt(crypt.read("test5.txt"), CHAIN, stages))
+        self.assertEqual(test.crypt_methods[CHAIN](), test.chain())
+
+    def test_crypt_stream(self):
+        logger.info("Testing 'crypt_stream' method...")
+        self.test_6.key = "long_keyword"
+        text = crypt.read("test6.txt")
+        for chunk_size in (1, 7, 1024):
+            out_file = io.StringIO()
+            self.test_6.crypt_stream(io.StringIO(text), out_file, chunk_size)
+            self.assertEqual(out_file.getvalue(),
+                             self.test_6.polyalphabetic())
+
+        out_file = io.BytesIO()
+        self.test_6.crypt_stream(io.BufferedReader(io.BytesIO(b"a\tb")),
+                                 out_file, 1)
+        self.assertEqual(out_file.getvalue(),
+                         decrypt(b"ab", 'P', "long_keyword"))
+        self.assertEqual(self.test_6.invalid, {"\t": 1})
+
+    def test_stats(self):
+        logger.info("Testing 'stats' attribute...")
+        self.test_6.key = "long_keyword"
+        self.test_6.crypt_file("crypt_file.txt", 100)
+        stages = self.test_6.stats.as_dict()["stages"]
+        self.assertEqual(stages["read"]["size"], 293)
+        self.assertEqual(stages["transform"]["size"], 293)
+        self.assertEqual(stages["transform"]["calls"], 3)
+        self.assertEqual(stages["compile"]["calls"], 3)
+        self.assertGreaterEqual(stages["compile"]["hits"], 2)
+
+        self.test_6.stats.reset()
+        self.test_6.polyalphabetic()
+        self.test_6.polyalphabetic()
+        stages = self.test_6.stats.as_dict()["stages"]
+        self.assertEqual((stages["read"]["hits"], stages["read"]["misses"]),
+                         (1, 1))
+        self.assertNotIn("write", stages)
+
+    def test_crypt_mmap(self):
+        logger.info("Testing 'crypt_mmap' method...")
+        self.test_6.key = "long_keyword"
+        for chunk_size in (1, 7, 1024):
+            self.test_6.crypt_mmap("crypt_mmap.txt", chunk_size)
+            self.assertEqual(crypt.read("crypt_mmap.txt"),
+                             self.test_6.polyalphabetic())
+
+        crypt.write("mmap_test.txt", "")
+        test = crypt("mmap_test.txt", "encrypt", 'C', 5)
+        test.crypt_mmap("crypt_mmap.txt")
+        self.assertEqual(crypt.read("crypt_mmap.txt"), "")
+
+        crypt.write("mmap_test.txt", "test\ttest")
+        with self.assertRaises(ValueError):
+            test.crypt_mmap("crypt_mmap.txt")
+        os.remove("mmap_test.txt")
+
+    def test_crypt_range(self):
+        logger.info("Testing 'crypt_range' method...")
+        self.test_6.key = "long_keyword"
+        text = self.test_6.polyalphabetic().encode()
+        for start, length in ((0, 10), (7, 100), (290, 10), (13, 0)):
+            self.assertEqual(self.test_6.crypt_range(start, length),
+                             text[start:start + length])
+        self.assertEqual(self.test_6.crypt_range(100), text[100:])
+
+    def test_crypt_lines(self):
+        logger.info("Testing 'crypt_lines' method...")
+        self.test_6.key = "long_keyword"
+        lines = self.test_6.polyalphabetic().encode().splitlines(True)
+        for first, count in ((0, 1), (3, 2), (9, 5), (20, 1), (2, 0)):
+            self.assertEqual(self.test_6.crypt_lines(first, count),
+                             b"".join(lines[first:first + count]))
+
+        index = self.test_6.index_lines("lines.index", interval=3)
+        self.assertEqual(len(index["offsets"]), len(lines) // 3 + 1)
+        self.assertEqual(self.test_6.read_index("lines.index"), index)
+        self.assertEqual(self.test_6.line_range(4, 3, "lines.index"),
+                         self.test_6.line_range(4, 3))
+        for first, count in ((0, 1), (3, 2), (7, 5), (20, 1)):
+            self.assertEqual(self.test_6.crypt_lines(first, count,
+                                                     "lines.index"),
+                             b"".join(lines[first:first + count]))
+
+        self.test_6.key = "test"
+        self.assertIsNone(self.test_6.read_index("lines.index"))
+        self.assertIsNone(self.test_6.read_index("fail.index"))
+
+    def test_crypt_incremental(self):
+        logger.info("Testing 'crypt_incremental' method...")
+        crypt.write("incremental_test.txt", "1.Some Text,\n")
+        test = crypt("incremental_test.txt", "encrypt", 'P', "test")
+        self.assertEqual(test.crypt_incremental("incremental.txt"), 0)
+
+        with open("incremental_test.txt", 'a') as f:
+            f.write("2.Some More Text,")
+        self.assertEqual(test.crypt_incremental("incremental.txt"), 13)
+        self.assertEqual(crypt.read("incremental.txt"), test.polyalphabetic())
+        state = crypt.read_state("incremental.txt.state")
+        self.assertEqual(state["offset"], 30)
+        self.assertEqual(state["key_position"], 2)
+
+        crypt.write("incremental_test.txt", "3.Even More Text.")
+        self.assertEqual(test.crypt_incremental("incremental.txt"), 0)
+        self.assertEqual(crypt.read("incremental.txt"), test.polyalphabetic())
+
+        test.key = "fail"
+        self.assertEqual(test.crypt_incremental("incremental.txt"), 0)
+        os.remove("incremental_test.txt")
+
+    def test_crypt_incremental_growing(self):
+        logger.info("Testing 'crypt_incremental' on a file growing during a "
+                    "run...")
+        crypt.write("incremental_test.txt", "line one\nline two\n")
+        test = crypt("incremental_test.txt", "encrypt", 'P', "test")
+        crypt_segments = test.crypt_segments
+
+        def append(*args):
+            with open("incremental_test.txt", 'a') as f:
+                f.write("line three\n")
+            return crypt_segments(*args)
+
+        with mock.patch.object(test, "crypt_segments", side_effect=append):
+            test.crypt_incremental("incremental.txt")
+        self.assertEqual(crypt.read_state("incremental.txt.state")["offset"],
+                         18)
+        self.assertEqual(test.crypt_incremental("incremental.txt"), 18)
+        self.assertEqual(crypt.read("incremental.txt"), test.polyalphabetic())
+        os.remove("incremental_test.txt")
+
+    def test_policy(self):
+        logger.info("Testing invalid character policies...")
+        crypt.write("policy_test.txt", "ab\tc\td")
+        test = crypt("policy_test.txt", "encrypt", 'P', "abc")
+        self.assertEqual(test.polyalphabetic(), "aced")
+        self.assertEqual(test.invalid, {"\t": 2})
+        self.assertEqual(test.invalid_offsets, [2, 4])
+
+        test.policy = "pass"
+        self.assertEqual(test.polyalphabetic(), "ac\tc\tf")
+
+        test.policy = "strict"
+        with self.assertRaises(InvalidCharacterError) as context:
+            test.polyalphabetic()
+        self.assertEqual(context.exception.invalid, [(2, "\t"), (4, "\t")])
+        with self.assertRaises(InvalidCharacterError):
+            test.crypt_mmap("crypt_mmap.txt")
+
+        test.workers = 2
+        test.policy = "skip"
+        self.assertEqual(test.polyalphabetic(), "aced")
+        os.remove("policy_test.txt")
+
+        self.assertRaises(ValueError, crypt, policy="fail")
+
+    def test_skip_round_trip(self):
+        logger.info("Testing that skipped characters use no key positions...")
+        text = "hello\tworld\nsecond line\n" * 50
+        crypt.write("skip_test.txt", text)
+        expected = text.replace("\t", "")
+        for workers in (1, 3):
+            test = crypt("skip_test.txt", "encrypt", 'P', "secret",
+                         workers=workers)
+            crypt.write("skip.txt", test.polyalphabetic())
+            test = crypt("skip.txt", "decrypt", 'P', "secret",
+                         workers=workers)
+            self.assertEqual(test.polyalphabetic(), expected)
+
+            test = crypt("skip_test.txt", "encrypt", 'P', "secret",
+                         workers=workers)
+            test.crypt_file("skip.txt", 7)
+            test = crypt("skip.txt", "decrypt", 'P', "secret",
+                         workers=workers)
+            test.crypt_file("skip_decrypted.txt", 7)
+            self.assertEqual(crypt.read("skip_decrypted.txt"), expected)
+
+        with open("skip_test.txt", 'wb') as f:
+            f.write(b"line one\r\nline two\r\n")
+        test = crypt("skip_test.txt", "encrypt", 'P', "secret")
+        test.crypt_incremental("skip.txt")
+        with open("skip_test.txt", 'ab') as f:
+            f.write(b"line three\r\n")
+        test.crypt_incremental("skip.txt")
+        test = crypt("skip.txt", "decrypt", 'P', "secret")
+        test.crypt_file("skip_decrypted.txt", 5, binary=True)
+        with open("skip_decrypted.txt", 'rb') as f:
+            self.assertEqual(f.read(), b"line one\nline two\nline three\n")
+        for file in ("skip_test.txt", "skip.txt", "skip.txt.state",
+                     "skip_decrypted.txt"):
+            os.remove(file)
+
+    def test_workers(self):
+        logger.info("Testing parallel encryption/decryption...")
+        self.test_6.key = "long_keyword"
+        test = crypt("test6.txt", "decrypt", 'P', "long_keyword", workers=3)
+        self.assertEqual(test.polyalphabetic(), self.test_6.polyalphabetic())
+
+        test.crypt_file("workers.txt", 7)
+        self.assertEqual(crypt.read("workers.txt"),
+                         self.test_6.polyalphabetic())
+
+    def test_file_data(self):
+        logger.info("Testing 'file_data' property...")
+        crypt.write("file_data_test.txt", "first")
+        test = crypt("file_data_test.txt")
+        self.assertEqual(test.file_data, "first")
+        self.assertIs(test.file_data, test.file_data)
+
+        crypt.write("file_data_test.txt", "second text")
+        self.assertEqual(test.file_data, "second text")
+        os.remove("file_data_test.txt")
+
     def test_file(self):
         with self.assertRaises(SystemExit):
             self.test_1.file = "test"
@@ -171,6 +430,12 @@ class CryptographyTest(unittest.TestCase):
         self.assertRaises(FileNotFoundError, crypt.read, "fail.txt")
         self.assertRaises(FileNotFoundError, crypt.read, "fail2.txt")
 
+    def test_read_chunks(self):
+        logger.info("Testing 'read_chunks' method...")
+        chunks = list(crypt.read_chunks("test.txt", 5))
+        self.assertEqual("".join(chunks), crypt.read("test.txt"))
+        self.assertTrue(all(len(chunk) <= 5 for chunk in chunks))
+
     def test_write(self):
         logger.info("Testing 'write' method...")
         self.assertIsNone(crypt.write("write.txt", "test"))
@@ -178,6 +443,667 @@ class CryptographyTest(unittest.TestCase):
         self.assertRaises(FileExistsError, crypt.write("fail2.txt", "test"))
 
 
+class CipherTest(unittest.TestCase):
+
+    def test_transform(self):
+        logger.info("Testing 'transform' method...")
+        for crypt_method, key in (('C', 5), ('M', "test"), ('P', "test")):
+            encrypted = Cipher(crypt_method, key, "encrypt").transform(CHARS)
+            decrypted = Cipher(crypt_method, key, "decrypt").transform(
+                encrypted)
+            self.assertNotEqual(encrypted, CHARS)
+            self.assertEqual(decrypted, CHARS)
+
+        self.assertEqual(Cipher('C', 1, "encrypt").transform("ab\t"), "bc\t")
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_numpy_backend(self):
+        logger.info("Testing the numpy backend...")
+        text = CHARS * 3 + "\t"
+        for crypt_method, key in (('C', 5), ('M', "test"), ('P', "test")):
+            for crypt_type in ("encrypt", "decrypt"):
+                python = Cipher(crypt_method, key, crypt_type)
+                array = Cipher(crypt_method, key, crypt_type, "numpy")
+                self.assertEqual(array.transform(text, 3),
+                                 python.transform(text, 3))
+                self.assertEqual(array.transform_array(text.encode(), 3),
+                                 python.transform(text.encode(), 3))
+
+        self.assertRaises(ValueError, Cipher, 'C', 5, "encrypt", "fail")
+
+    def test_encrypt(self):
+        logger.info("Testing 'encrypt' and 'decrypt' functions...")
+        test6_text = crypt.read("test6.txt")
+        self.assertEqual(decrypt(test6_text, 'P', "long_keyword"),
+                         crypt("test6.txt", "decrypt", 'P',
+                               "long_keyword").polyalphabetic())
+        self.assertEqual(encrypt("1.Some Text,", 'c', 5), "6=XtrjdYjCy;")
+        self.assertEqual(decrypt(b"6=XtrjdYjCy;\xff", 'C', 5),
+                         b"1.Some Text,\xff")
+
+        for key in (95, -1, "5", None):
+            self.assertRaises(ValueError, encrypt, "test", 'C', key)
+        self.assertRaises(ValueError, Cipher, 'C', 5, "fail")
+
+    def test_transform_bytes(self):
+        logger.info("Testing 'transform_bytes' method...")
+        text = CHARS * 3 + "\t\xff"
+        for crypt_method, key in (('C', 5), ('M', "test"), ('P', "test")):
+            for crypt_type in ("encrypt", "decrypt"):
+                cipher = Cipher(crypt_method, key, crypt_type)
+                self.assertEqual(
+                    cipher.transform_bytes(text.encode('latin-1'), 3),
+                    cipher.transform(text, 3).encode('latin-1'))
+
+    def test_period(self):
+        logger.info("Testing 'period' property...")
+        self.assertEqual(Cipher('C', 5, "encrypt").period, 1)
+        self.assertEqual(Cipher('M', "test", "encrypt").period, 1)
+        self.assertEqual(Cipher('P', "test", "encrypt").period, 4)
+        self.assertRaises(ValueError, Cipher, 'P', "\t", "encrypt")
+        self.assertRaises(ValueError, Cipher, 'P', "", "encrypt")
+
+    def test_find_invalid(self):
+        logger.info("Testing 'find_invalid' method...")
+        self.assertEqual(Cipher.find_invalid("test"), [])
+        self.assertEqual(Cipher.find_invalid("a\tb\xe9", 10),
+                         [(11, "\t"), (13, "\xe9")])
+        self.assertEqual(Cipher.find_invalid(b"a\r\n\xff"),
+                         [(1, "\r"), (3, "\xff")])
+
+    def test_fingerprint(self):
+        logger.info("Testing 'fingerprint' property...")
+        fingerprint = Cipher('P', "test", "encrypt").fingerprint
+        self.assertEqual(Cipher('P', "test", "decrypt").fingerprint,
+                         fingerprint)
+        self.assertNotEqual(Cipher('M', "test", "encrypt").fingerprint,
+                            fingerprint)
+        self.assertNotIn("test", fingerprint)
+
+    def test_chain(self):
+        logger.info("Testing 'Chain' class...")
+        stages = [('C', 5, "encrypt"), ('M', "test", "encrypt"),
+                  ('P', "abc", "encrypt"), ('P', "long_keyword", "decrypt")]
+        text = crypt.read("test5.txt") + "\t"
+        expected = text
+        for stage in stages:
+            expected = Cipher(*stage).transform(expected, 3)
+
+        chain = Chain(stages)
+        self.assertEqual(chain.period, 12)
+        self.assertEqual(chain.transform(text, 3), expected)
+        self.assertEqual(chain.transform(text.encode(), 3), expected.encode())
+        self.assertEqual(Chain(stages, "decrypt").transform(expected, 3),
+                         text)
+        self.assertEqual(encrypt(text, CHAIN, stages, 3), expected)
+        self.assertEqual(decrypt(expected, CHAIN, stages, 3), text)
+        self.assertRaises(ValueError, Chain, [])
+
+    def test_chain_unfused(self):
+        logger.info("Testing 'Chain' class without fused tables...")
+        stages = [('P', "a" * 63 + "b", "encrypt"),
+                  ('P', "a" * 64 + "b", "encrypt"), ('C', 1, "decrypt")]
+        text = crypt.read("test5.txt")
+        chain = Chain(stages)
+        self.assertEqual((chain.period, chain.tables), (64 * 65, []))
+        expected = text
+        for stage in stages:
+            expected = Cipher(*stage).transform(expected, 7)
+        self.assertEqual(chain.transform(text, 7), expected)
+        self.assertEqual(Chain(stages, "decrypt").transform(expected, 7),
+                         text)
+
+    def test_parse_chain(self):
+        logger.info("Testing 'parse_chain' function...")
+        self.assertEqual(parse_chain([("c", "e", "5"), ("M", "D", "5")]),
+                         (('C', 5, "encrypt"), ('M', "5", "decrypt")))
+        self.assertRaises(ValueError, parse_chain, [("C", "E", "95")])
+        self.assertRaises(ValueError, parse_chain, [("X", "E", "5")])
+        self.assertRaises(ValueError, parse_chain, [("C", "X", "5")])
+
+    def test_encrypt_many(self):
+        logger.info("Testing 'encrypt_many' and 'decrypt_many' functions...")
+        messages = ["Some text", "", "héllo\tworld", "x" * 10, "ab"]
+        for method, key in (('C', 5), ('P', "abc"),
+                            (CHAIN, [('M', "key", "encrypt"),
+                                     ('P', "long key", "encrypt")])):
+            expected = [encrypt(message, method, key) for message in messages]
+            encrypted = encrypt_many(messages, method, key)
+            self.assertEqual(encrypted, expected)
+            self.assertEqual(decrypt_many(encrypted, method, key), messages)
+
+        data = [message.encode() for message in messages]
+        offsets = [3, 0, 7, 1, 2]
+        expected = [encrypt(message, 'P', "abcd", offset)
+                    for message, offset in zip(data, offsets)]
+        self.assertEqual(encrypt_many(data, 'p', "abcd", offsets), expected)
+        with ThreadPoolExecutor(2) as executor:
+            self.assertEqual(encrypt_many(data * 3, 'P', "abcd", offsets * 3,
+                                          executor), expected * 3)
+        self.assertEqual(encrypt_many([], 'P', "abcd"), [])
+        self.assertRaises(ValueError, encrypt_many, data, 'P', "abcd", [0])
+        self.assertRaises(ValueError, encrypt_many, data, 'C', 95)
+
+    def test_key_stream(self):
+        logger.info("Testing 'key_stream' method...")
+        cipher = Cipher('P', "abc", "encrypt")
+        self.assertEqual(cipher.shifts, [0, 1, 2])
+        self.assertEqual(list(islice(cipher.key_stream(), 5)), [0, 1, 2, 0, 1])
+        self.assertEqual(list(islice(cipher.key_stream(4), 3)), [1, 2, 0])
+
+
+class CipherCacheTest(unittest.TestCase):
+
+    def test_get(self):
+        logger.info("Testing 'get' method...")
+        cache = CipherCache(2)
+        cipher = cache.get('P', "test", "encrypt")
+        self.assertIs(cache.get('P', "test", "encrypt"), cipher)
+        self.assertEqual(cache.get('P', "test", "decrypt").crypt_type,
+                         "decrypt")
+        self.assertEqual(cache.info(), (2, 1, 2, 1))
+
+        cache.get('C', 5, "encrypt")
+        cache.get('M', "test", "encrypt")
+        self.assertEqual(cache.info().currsize, 2)
+        self.assertIsNot(cache.get('P', "test", "encrypt"), cipher)
+
+    def test_maxsize(self):
+        logger.info("Testing 'maxsize' property...")
+        cache = CipherCache()
+        for key in range(5):
+            cache.get('C', key, "encrypt")
+        cache.maxsize = 2
+        self.assertEqual(cache.info().currsize, 2)
+
+        cache.maxsize = 0
+        cache.get('C', 5, "encrypt")
+        self.assertEqual(cache.info().currsize, 0)
+        self.assertRaises(ValueError, setattr, cache, "maxsize", -1)
+
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 0, 0))
+
+
+class MainTest(unittest.TestCase):
+
+    def run_main(self, *argv, stdin="", stderr=None):
+        """ Runs main without a terminal, returning its exit status. """
+        stdout = io.TextIOWrapper(io.BytesIO(), write_through=True)
+        with mock.patch("sys.stdin", io.StringIO(stdin)), \
+                redirect_stdout(stdout), \
+                redirect_stderr(stderr or io.StringIO()):
+            try:
+                main(list(argv))
+            except SystemExit as e:
+                return e.code, stdout.buffer.getvalue().decode()
+        return 0, stdout.buffer.getvalue().decode()
+
+    def test_main(self):
+        logger.info("Testing 'main' function...")
+        text = crypt.read("test5.txt")
+        status, _ = self.run_main("test5.txt", "-m", "p", "-t", "e",
+                                  "-k", "test", "-o", "main.txt")
+        self.assertEqual(status, 0)
+        self.assertEqual(crypt.read("main.txt"), encrypt(text, 'P', "test"))
+        os.remove("main.txt")
+
+    def test_main_streams(self):
+        logger.info("Testing 'main' function with stdin and stdout...")
+        text = crypt.read("test5.txt")
+        status, output = self.run_main("-", "-m", "C", "-t", "E", "-k", "5",
+                                       "-o", "-", stdin=text)
+        self.assertEqual(status, 0)
+        self.assertEqual(output, encrypt(text, 'C', 5))
+
+    def test_main_invalid_streams(self):
+        logger.info("Testing 'main' function with invalid characters in "
+                    "stdin...")
+        stderr = io.StringIO()
+        status, output = self.run_main("-", "-m", "C", "-t", "E", "-k", "1",
+                                       "-o", "-", stdin="hello\tworld\n",
+                                       stderr=stderr)
+        self.assertEqual((status, output),
+                         (0, encrypt("helloworld\n", 'C', 1)))
+        self.assertIn("1 invalid characters skipped", stderr.getvalue())
+
+    def test_main_keys(self):
+        logger.info("Testing 'main' function key sources...")
+        text = crypt.read("test5.txt")
+        crypt.write("main_key.txt", "test\n")
+        status, output = self.run_main("test5.txt", "-m", "P", "-t", "E",
+                                       "--key-file", "main_key.txt",
+                                       "-o", "-")
+        self.assertEqual((status, output), (0, encrypt(text, 'P', "test")))
+        os.remove("main_key.txt")
+
+        with mock.patch.dict(os.environ, {KEY_ENV: "5"}):
+            status, output = self.run_main("test5.txt", "-m", "C", "-t", "E",
+                                           "-o", "-")
+        self.assertEqual((status, output), (0, encrypt(text, 'C', 5)))
+
+    def test_main_workers(self):
+        logger.info("Testing 'main' function with invalid workers...")
+        for workers in ("0", "-1", "two"):
+            self.assertEqual(self.run_main("test5.txt", "-m", "C", "-t", "E",
+                                           "-k", "5", "-w", workers)[0], 2)
+        self.assertRaises(ValueError, crypt, "test5.txt", workers=0)
+
+    def test_main_chain(self):
+        logger.info("Testing 'main' function with a chain...")
+        text = crypt.read("test5.txt")
+        stages = (('C', 5, "encrypt"), ('P', "test", "decrypt"))
+        chain = ["-c", "C", "E", "5", "-c", "P", "D", "test"]
+        status, output = self.run_main("test5.txt", "-t", "E", "-o", "-",
+                                       *chain)
+        self.assertEqual((status, output), (0, encrypt(text, CHAIN, stages)))
+        self.assertEqual(self.run_main("test5.txt", "-t", "E", "-m", "C",
+                                       *chain)[0], 2)
+
+    def test_main_lines(self):
+        logger.info("Testing 'main' function with ranges of lines...")
+        lines = decrypt(crypt.read("test6.txt"), 'P',
+                        "long_keyword").splitlines(True)
+        key = ["-m", "P", "-t", "D", "-k", "long_keyword"]
+        status, output = self.run_main("test6.txt", *key, "--lines", "2",
+                                       "3")
+        self.assertEqual((status, output), (0, "".join(lines[1:4])))
+        status, output = self.run_main("test6.txt", *key, "--range", "5",
+                                       "10")
+        self.assertEqual((status, output), (0, "".join(lines)[5:15]))
+        self.assertEqual(self.run_main("test6.txt", *key, "--lines", "0",
+                                       "3")[0], 2)
+
+    def test_main_metrics(self):
+        logger.info("Testing 'main' function metrics...")
+        status, _ = self.run_main("test5.txt", "-m", "C", "-t", "E", "-k",
+                                  "5", "-o", "main.txt", "--metrics",
+                                  "main_metrics.json")
+        self.assertEqual(status, 0)
+        with open("main_metrics.json") as f:
+            metrics = json.load(f)
+        self.assertEqual(set(metrics["stages"]),
+                         {"read", "compile", "scan", "transform", "write"})
+        os.remove("main.txt")
+        os.remove("main_metrics.json")
+
+    def test_main_errors(self):
+        logger.info("Testing 'main' function exit statuses...")
+        with mock.patch.dict(os.environ):
+            os.environ.pop(KEY_ENV, None)
+            self.assertEqual(self.run_main("test5.txt", "-m", "C", "-t",
+                                           "E")[0], 2)
+        self.assertEqual(self.run_main("test5.txt", "-m", "C", "-k", "5")[0],
+                         2)
+        self.assertEqual(self.run_main("test5.txt", "-m", "C", "-t", "E",
+                                       "-k", "95")[0], 2)
+        self.assertEqual(self.run_main("fail.txt", "-m", "C", "-t", "E",
+                                       "-k", "5")[0], 2)
+        self.assertEqual(self.run_main("-", "-m", "C", "-t", "E", "-k", "5",
+                                       "-i", "strict", "-o", "-",
+                                       stdin="a\tb")[0], 1)
+
+
+class BatchTest(unittest.TestCase):
+
+    def test_find_files(self):
+        logger.info("Testing 'find_files' function...")
+        self.assertIn("test.txt", batch.find_files("test*.txt"))
+        self.assertEqual(batch.find_files("fail*.txt"), [])
+
+    def test_run_twice(self):
+        logger.info("Testing a batch run twice on a directory...")
+        cipher = Cipher('C', 5, "encrypt")
+        with tempfile.TemporaryDirectory() as directory:
+            crypt.write(os.path.join(directory, "batch.txt"), "Some text")
+            for _ in range(2):
+                files = batch.find_files(directory, cipher)
+                self.assertEqual(files, [os.path.join(directory,
+                                                      "batch.txt")])
+                list(batch.crypt_files(files, cipher, workers=1))
+            self.assertEqual(sorted(os.listdir(directory)),
+                             ["batch.txt", "batch_Caesar_Encrypted.txt"])
+            decrypt_cipher = Cipher('C', 5, "decrypt")
+            self.assertEqual(len(batch.find_files(directory,
+                                                  decrypt_cipher)), 2)
+
+    def test_output_file(self):
+        logger.info("Testing 'output_file' function...")
+        cipher = Cipher('C', 5, "encrypt")
+        self.assertEqual(batch.output_file("test.txt", cipher),
+                         "test_Caesar_Encrypted.txt")
+        self.assertEqual(batch.output_file("test.txt", cipher, "out"),
+                         os.path.join("out", "test_Caesar_Encrypted.txt"))
+
+    def test_crypt_file(self):
+        logger.info("Testing 'crypt_file' function...")
+        cipher = Cipher('P', "long_keyword", "decrypt")
+        result = batch.crypt_file("test6.txt", "batch.txt", cipher, 7)
+        self.assertEqual(result[:4], ("test6.txt", "batch.txt", 293, 0))
+        self.assertEqual(crypt.read("batch.txt"),
+                         crypt("test6.txt", "decrypt", 'P',
+                               "long_keyword").polyalphabetic())
+        os.remove("batch.txt")
+
+    def test_crypt_chunk(self):
+        logger.info("Testing 'crypt_chunk' function...")
+        cipher = Cipher('C', 1, "encrypt")
+        self.assertEqual(batch.crypt_chunk(cipher, "ab"), ("bc", 0))
+        self.assertEqual(batch.crypt_chunk(cipher, "a\tb\t"), ("bc", 2))
+        cipher = Cipher('P', "secret", "encrypt")
+        data, invalid = batch.crypt_chunk(cipher, "he\tllo", 3)
+        self.assertEqual((data, invalid), (encrypt("hello", 'P', "secret",
+                                                   3), 1))
+
+    def test_parse_key(self):
+        logger.info("Testing 'parse_key' function...")
+        self.assertEqual(batch.parse_key('C', "5"), 5)
+        self.assertEqual(batch.parse_key('P', "5"), "5")
+        self.assertRaises(ValueError, batch.parse_key, 'C', "95")
+        self.assertRaises(ValueError, batch.parse_key, 'C', "test")
+        self.assertRaises(ValueError, batch.parse_key, 'P', "\t")
+
+
+class PipelineTest(unittest.TestCase):
+
+    def test_crypt_file(self):
+        logger.info("Testing 'crypt_file' coroutine...")
+        cipher = Cipher('P', "long_keyword", "decrypt")
+        result = asyncio.run(pipeline.crypt_file("test6.txt", "pipeline.txt",
+                                                 cipher, 7, 2))
+        self.assertEqual(result[:4], ("test6.txt", "pipeline.txt", 293, 0))
+        self.assertEqual(crypt.read("pipeline.txt"),
+                         crypt("test6.txt", "decrypt", 'P',
+                               "long_keyword").polyalphabetic())
+        os.remove("pipeline.txt")
+
+    def test_crypt_files(self):
+        logger.info("Testing 'crypt_files' coroutine...")
+        cipher = Cipher('C', 5, "encrypt")
+        results = asyncio.run(pipeline.crypt_files(
+            ["test.txt", "test3.txt"], cipher, concurrency=1))
+        self.assertEqual([result[1] for result in results],
+                         ["test_Caesar_Encrypted.txt",
+                          "test3_Caesar_Encrypted.txt"])
+        for result in results:
+            self.assertEqual(crypt.read(result[1]),
+                             cipher.transform(crypt.read(result[0])))
+            os.remove(result[1])
+        self.assertRaises(ValueError, asyncio.run, pipeline.crypt_files(
+            ["test.txt"], cipher, concurrency=0))
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix sockets")
+class ServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "server.sock")
+        ready = threading.Event()
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.create_task(server.serve(self.path, ready))
+        self.thread = threading.Thread(target=self.run_server)
+        self.thread.start()
+        ready.wait(5)
+
+    def run_server(self):
+        try:
+            self.loop.run_until_complete(self.server)
+        except asyncio.CancelledError:
+            pass
+
+    def tearDown(self):
+        self.loop.call_soon_threadsafe(self.server.cancel)
+        self.thread.join()
+        self.loop.close()
+        self.assertFalse(os.path.exists(self.path))
+        self.directory.cleanup()
+
+    def test_transform(self):
+        logger.info("Testing 'transform' method...")
+        text = crypt.read("test5.txt")
+        with Client(self.path) as client:
+            self.assertEqual(client.encrypt(text, 'P', "test"),
+                             encrypt(text, 'P', "test"))
+            self.assertEqual(client.decrypt(b"Mjqqt", 'c', 5), b"Hello")
+            self.assertEqual(client.transform('P', "test", "encrypt", "st", 2),
+                             encrypt("test", 'P', "test")[2:])
+            self.assertEqual(client.transform('C', 1, "encrypt", "a\tb",
+                                              policy="skip"), "bc")
+            self.assertEqual(client.transform('P', "secret", "encrypt",
+                                              "hello\tworld",
+                                              policy="skip"),
+                             encrypt("helloworld", 'P', "secret"))
+
+    def test_transform_many(self):
+        logger.info("Testing 'transform_many' method...")
+        messages = [f"Message {number}" for number in range(1000)]
+        with Client(self.path) as client:
+            self.assertEqual(
+                client.transform_many(('M', "test", "encrypt", message)
+                                      for message in messages),
+                [encrypt(message, 'M', "test") for message in messages])
+
+    def test_errors(self):
+        logger.info("Testing server errors...")
+        with Client(self.path) as client:
+            self.assertRaises(ValueError, client.encrypt, "a", 'C', 95)
+            self.assertRaises(ValueError, client.transform, 'C', 1,
+                              "encrypt", "a\tb", policy="strict")
+            self.assertRaises(ValueError, client.transform_many,
+                              [('C', 1, "encrypt", "a"),
+                               ('X', 1, "encrypt", "a")])
+            for header in (b"[]", b'"x"', b"not json"):
+                client.socket.sendall(frame(header) + frame(b"a"))
+                self.assertRaises(ValueError, client.read_response)
+            self.assertEqual(client.encrypt("a", 'C', 1), "b")
+
+    def test_running(self):
+        logger.info("Testing 'serve' function on a socket in use...")
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertRaises(OSError, loop.run_until_complete,
+                              server.serve(self.path))
+        finally:
+            loop.close()
+        with Client(self.path) as client:
+            self.assertEqual(client.encrypt("a", 'C', 1), "b")
+
+    def test_stale(self):
+        logger.info("Testing 'remove_stale' function...")
+        path = os.path.join(self.directory.name, "stale.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        server.remove_stale(path)
+        self.assertFalse(os.path.exists(path))
+
+
+class ContainerTest(unittest.TestCase):
+
+    def setUp(self):
+        with open("container_test.txt", 'wb') as f:
+            f.write(crypt.read("test6.txt").encode() + b"\t\xff\r\n")
+        self.header = container.pack("container_test.txt", "container.tc",
+                                     'P', "test", chunk_size=64)
+
+    def tearDown(self):
+        for file in ("container_test.txt", "container.tc", "container.txt"):
+            if os.path.exists(file):
+                os.remove(file)
+
+    def test_pack(self):
+        logger.info("Testing 'pack' function...")
+        header, chunks = container.read_index("container.tc")
+        self.assertEqual(header, self.header)
+        self.assertEqual((header["method"], header["crypt_type"]),
+                         ('P', "encrypt"))
+        self.assertEqual(header["fingerprint"],
+                         Cipher('P', "test", "encrypt").fingerprint)
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(sum(length for _, length, _ in chunks), 297)
+        for chunk_size in (0, -1):
+            self.assertRaises(ValueError, container.pack,
+                              "container_test.txt", "container.tc", 'P',
+                              "test", chunk_size=chunk_size)
+
+    def test_unpack(self):
+        logger.info("Testing 'unpack' function...")
+        for workers in (1, 2):
+            container.unpack("container.tc", "container.txt", "test",
+                             workers)
+            with open("container.txt", 'rb') as f, \
+                    open("container_test.txt", 'rb') as original:
+                self.assertEqual(f.read(), original.read())
+
+    def test_wrong_key(self):
+        logger.info("Testing 'unpack' function with the wrong key...")
+        self.assertRaises(container.ContainerError, container.unpack,
+                          "container.tc", "container.txt", "fail")
+        self.assertFalse(os.path.exists("container.txt"))
+
+    def test_verify(self):
+        logger.info("Testing 'verify' function...")
+        self.assertEqual(container.verify("container.tc"), [])
+        _, chunks = container.read_index("container.tc")
+        with open("container.tc", 'r+b') as f:
+            f.seek(chunks[3][0])
+            f.write(b"?")
+        self.assertEqual(container.verify("container.tc"), [3])
+        with self.assertRaises(container.ContainerError) as error:
+            container.unpack("container.tc", "container.txt", "test")
+        self.assertEqual(error.exception.chunks, [3])
+        self.assertFalse(os.path.exists("container.txt"))
+        self.assertRaises(container.ContainerError, container.read_index,
+                          "container_test.txt")
+
+    def test_truncated_index(self):
+        logger.info("Testing 'read_index' function with missing chunks...")
+        _, chunks = container.read_index("container.tc")
+        with open("container.tc", 'r+b') as f:
+            index_offset = container.FOOTER.unpack(
+                f.read()[-container.FOOTER.size:])[0]
+            index_data = json.dumps(chunks[:-1]).encode()
+            f.seek(index_offset)
+            f.truncate()
+            f.write(index_data + container.FOOTER.pack(
+                index_offset, len(index_data), container.MAGIC))
+        self.assertRaises(container.ContainerError, container.verify,
+                          "container.tc")
+        self.assertRaises(container.ContainerError, container.unpack,
+                          "container.tc", "container.txt", "test")
+        self.assertFalse(os.path.exists("container.txt"))
+
+    def test_chain_key(self):
+        logger.info("Testing 'unpack' function with a chain container...")
+        stages = (('C', 5, "encrypt"), ('P', "test", "encrypt"))
+        container.pack("container_test.txt", "container.tc", CHAIN, stages)
+        self.assertRaises(container.ContainerError, container.unpack,
+                          "container.tc", "container.txt", "anything")
+        argv = ["container", "unpack", "container.tc", "container.txt",
+                "-k", "anything"]
+        with mock.patch("sys.argv", argv), redirect_stderr(io.StringIO()), \
+                self.assertRaises(SystemExit) as error:
+            container.main()
+        self.assertEqual(error.exception.code, 2)
+        container.unpack("container.tc", "container.txt", stages)
+        with open("container.txt", 'rb') as f, \
+                open("container_test.txt", 'rb') as original:
+            self.assertEqual(f.read(), original.read())
+
+
+class CrackTest(unittest.TestCase):
+
+    def test_histogram(self):
+        logger.info("Testing 'histogram' function...")
+        counts = crack.histogram("aab\t")
+        self.assertEqual(len(counts), len(CHARS))
+        self.assertEqual(counts[:3], [2, 1, 0])
+        self.assertEqual(sum(counts), 3)
+
+    def test_index_of_coincidence(self):
+        logger.info("Testing 'index_of_coincidence' function...")
+        self.assertEqual(crack.index_of_coincidence(crack.histogram("aaaa")),
+                         1.0)
+        self.assertEqual(crack.index_of_coincidence(crack.histogram("ab")),
+                         0.0)
+        self.assertEqual(crack.index_of_coincidence([]), 0.0)
+
+    def test_crack_caesar(self):
+        logger.info("Testing 'crack_caesar' function...")
+        self.assertEqual(crack.crack_caesar(crypt.read("test2.txt")), 43)
+        text = decrypt(crypt.read("test2.txt"), 'C', 43)
+        for key in (1, 5, 94):
+            self.assertEqual(crack.crack_caesar(encrypt(text, 'C', key)), key)
+
+    def test_crack_polyalphabetic(self):
+        logger.info("Testing 'crack_polyalphabetic' function...")
+        text = decrypt(crypt.read("test6.txt"), 'P', "long_keyword") * 8
+        encrypted = encrypt(text, 'P', "test")
+        self.assertEqual(crack.key_length(encrypted), 4)
+        self.assertEqual(crack.crack_polyalphabetic(encrypted), "test")
+
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_parse_size(self):
+        logger.info("Testing 'parse_size' function...")
+        self.assertEqual(benchmark.parse_size("100"), 100)
+        self.assertEqual(benchmark.parse_size("1K"), 1024)
+        self.assertEqual(benchmark.parse_size("100m"), 100 * 1024 ** 2)
+
+    def test_generate_text(self):
+        logger.info("Testing 'generate_text' function...")
+        text = benchmark.generate_text(5000)
+        self.assertEqual(len(text), 5000)
+        self.assertEqual(text, benchmark.generate_text(5000))
+        self.assertFalse(Cipher.invalid_characters(text))
+
+    def test_benchmark(self):
+        logger.info("Testing 'benchmark' function...")
+        results = list(benchmark.benchmark(["1K"], [4], repeat=1))
+        self.assertEqual(len(results), 2 + 2 + 2)
+        self.assertTrue(all(result["size"] == 1024 for result in results))
+
+
+class StatsTest(unittest.TestCase):
+
+    def test_stage(self):
+        logger.info("Testing 'stage' method...")
+        stats = Stats()
+        with stats.stage("read") as call:
+            call["size"] = 1024
+        stats.add("read", 1.0, 1024, hit=True)
+        stats.add("compile", 0.5, hit=False)
+        stages = stats.as_dict()["stages"]
+        self.assertEqual(list(stages), ["read", "compile"])
+        self.assertEqual(stages["read"]["calls"], 2)
+        self.assertEqual(stages["read"]["size"], 2048)
+        self.assertEqual(stages["read"]["hits"], 1)
+        self.assertEqual(stages["compile"]["misses"], 1)
+        self.assertGreaterEqual(stats.seconds, 1.5)
+
+    def test_report(self):
+        logger.info("Testing 'report' method...")
+        stats = Stats()
+        stats.add("transform", 2.0, 1024 ** 2)
+        report = stats.report().splitlines()
+        self.assertEqual(len(report), 3)
+        self.assertTrue(report[1].startswith("transform"))
+        self.assertIn("0.50", report[1])
+        stats.reset()
+        self.assertEqual(stats.as_dict(), {"seconds": 0, "stages": {}})
+
+
+class PreviewTest(unittest.TestCase):
+
+    def test_str(self):
+        logger.info("Testing 'Preview' class...")
+        self.assertEqual(str(Preview("test")), "'test'")
+        self.assertEqual(str(Preview("test", 2)), "'te'... (4 total)")
+        self.assertEqual(str(Preview([1, 2, 3], 1)), "[1]... (3 total)")
+
+
 class CheckTest(unittest.TestCase):
 
     def test_file_exits(self):